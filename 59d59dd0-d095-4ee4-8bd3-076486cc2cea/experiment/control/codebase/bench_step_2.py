@@ -0,0 +1,84 @@
+"""Benchmark and statistical check of the truncated-normal sampler in step_2.
+
+Kept out of step_2's demo run because it draws tens of millions of values.
+Run with `python bench_step_2.py`.
+"""
+import time
+import numpy as np
+from step_2 import sample_truncated_normal
+
+
+def benchmark_truncated_normal(n=10000000, mean=50.0, sd=15.0, low=0.0, upp=100.0, seed=0):
+    """Times `sample_truncated_normal` against scipy's `truncnorm.rvs`.
+
+    Args:
+        n (int): The number of draws per method.
+        mean (float): Mean of the untruncated normal.
+        sd (float): Standard deviation of the untruncated normal.
+        low (float): Lower truncation bound.
+        upp (float): Upper truncation bound.
+        seed (int): Seed of the generators.
+
+    Returns:
+        dict: Wall-clock seconds per method.
+    """
+    from scipy.stats import truncnorm
+
+    a, b = (low - mean) / sd, (upp - mean) / sd
+    samplers = {
+        'scipy truncnorm.rvs': lambda rng: truncnorm.rvs(a, b, loc=mean, scale=sd, size=n, random_state=rng),
+        'inverse CDF float64': lambda rng: sample_truncated_normal(n, mean, sd, low, upp, rng),
+        'inverse CDF float32': lambda rng: sample_truncated_normal(n, mean, sd, low, upp, rng, np.float32),
+    }
+    timings = {}
+    for name, sampler in samplers.items():
+        start = time.perf_counter()
+        sampler(np.random.default_rng(seed))
+        timings[name] = time.perf_counter() - start
+        print(name + ": " + str(round(timings[name], 3)) + " s for " + str(n) + " draws")
+    return timings
+
+
+def check_truncated_normal_equivalence(n=1000000, mean=50.0, sd=15.0, low=0.0, upp=100.0, seed=0):
+    """Checks `sample_truncated_normal` against scipy's exact truncated normal.
+
+    Runs a one-sample Kolmogorov-Smirnov test against `truncnorm.cdf` and
+    compares the sample mean and variance with the exact moments.
+
+    Args:
+        n (int): The number of draws.
+        mean (float): Mean of the untruncated normal.
+        sd (float): Standard deviation of the untruncated normal.
+        low (float): Lower truncation bound.
+        upp (float): Upper truncation bound.
+        seed (int): Seed of the generator.
+
+    Returns:
+        dict: The KS statistic and p-value and the sample and exact moments.
+    """
+    from scipy.stats import kstest, truncnorm
+
+    a, b = (low - mean) / sd, (upp - mean) / sd
+    draws = sample_truncated_normal(n, mean, sd, low, upp, seed)
+    ks = kstest(draws, truncnorm(a, b, loc=mean, scale=sd).cdf)
+    exact_mean, exact_var = truncnorm.stats(a, b, loc=mean, scale=sd, moments='mv')
+    result = {
+        'ks_statistic': ks.statistic,
+        'ks_pvalue': ks.pvalue,
+        'within_bounds': bool(draws.min() >= low and draws.max() <= upp),
+        'sample_mean': draws.mean(),
+        'exact_mean': float(exact_mean),
+        'sample_var': draws.var(ddof=1),
+        'exact_var': float(exact_var),
+    }
+    print("KS statistic = " + str(result['ks_statistic']) + ", p-value = " + str(result['ks_pvalue']))
+    print("Mean: sample " + str(result['sample_mean']) + " vs exact " + str(result['exact_mean']))
+    print("Variance: sample " + str(result['sample_var']) + " vs exact " + str(result['exact_var']))
+    return result
+
+
+if __name__ == '__main__':
+    print("Truncated-normal sampler equivalence check:")
+    check_truncated_normal_equivalence()
+    print("\nTruncated-normal sampler benchmark:")
+    benchmark_truncated_normal()
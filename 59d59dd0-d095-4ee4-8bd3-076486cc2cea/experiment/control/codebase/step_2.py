@@ -1,14 +1,60 @@
 import numpy as np
 import pandas as pd
-from scipy.stats import truncnorm
+from scipy.special import log_ndtr, ndtr, ndtri, ndtri_exp
 import os
 
 
-def get_truncated_normal(mean=0, sd=1, low=0, upp=10):
+def sample_truncated_normal(size, mean=0, sd=1, low=0, upp=10, random_state=None, dtype=np.float64):
+    """Draws from a truncated normal distribution by inverse-CDF sampling.
+
+    The bounds are mirrored, when needed, so that sampling always happens on
+    the lower side of the standard normal, where the CDF is accurate. Intervals
+    deep in the tail are inverted in log space so they do not underflow.
+
+    Args:
+        size (int): The number of draws.
+        mean (float): Mean of the untruncated normal.
+        sd (float): Standard deviation of the untruncated normal.
+        low (float): Lower truncation bound.
+        upp (float): Upper truncation bound.
+        random_state (int or numpy.random.Generator): Seed or generator for the uniforms.
+        dtype (numpy.dtype): Output dtype, e.g. np.float32.
+
+    Returns:
+        numpy.ndarray: The draws.
+    """
+    rng = np.random.default_rng(random_state)
+    a, b = (low - mean) / sd, (upp - mean) / sd
+    flip = a + b > 0
+    if flip:
+        a, b = -b, -a
+
+    u = rng.random(size)
+    if b > -5:
+        cdf_a, cdf_b = ndtr(a), ndtr(b)
+        z = ndtri(cdf_a + u * (cdf_b - cdf_a))
+    else:
+        z = ndtri_exp(np.logaddexp(log_ndtr(a) + np.log1p(-u), log_ndtr(b) + np.log(u)))
+    np.clip(z, a, b, out=z)
+
+    if flip:
+        z = -z
+    return (mean + sd * z).astype(dtype, copy=False)
+
+
+class TruncatedNormal:
+    """Frozen truncated normal with an `rvs` method backed by `sample_truncated_normal`."""
+
+    def __init__(self, mean=0, sd=1, low=0, upp=10, dtype=np.float64):
+        self.mean, self.sd, self.low, self.upp, self.dtype = mean, sd, low, upp, dtype
+
+    def rvs(self, size, random_state=None):
+        return sample_truncated_normal(size, self.mean, self.sd, self.low, self.upp, random_state, self.dtype)
+
+
+def get_truncated_normal(mean=0, sd=1, low=0, upp=10, dtype=np.float64):
     """Creates a truncated normal distribution object."""
-    return truncnorm(
-        (low - mean) / sd, (upp - mean) / sd, loc=mean, scale=sd
-    )
+    return TruncatedNormal(mean=mean, sd=sd, low=low, upp=upp, dtype=dtype)
 
 
 def generate_population(n, score_dist, lr_dist):
@@ -68,9 +114,32 @@ def update_score(current_score, effective_lr, mastery_ceiling):
     return current_score + effective_lr * (mastery_ceiling - current_score)
 
 
-def run_simulation(initial_population_df, group_assignments, t_steps, mastery_ceiling, boost, decay_rate):
+def calculate_boost_schedule(t_steps, boost, decay_rate):
+    """Precomputes the decaying learning-rate boost for every time step.
+
+    Args:
+        t_steps (int): The total number of time steps for the simulation.
+        boost (float): The initial boost to the learning rate for treated students.
+        decay_rate (float): The rate at which the boost effect decays.
+
+    Returns:
+        numpy.ndarray: Array of length t_steps whose entry t - 1 is the boost
+                       applied to treated students at time step t.
+    """
+    return boost * np.exp(-decay_rate * np.arange(t_steps))
+
+
+def run_simulation(initial_population_df, group_assignments, t_steps, mastery_ceiling, boost, decay_rate,
+                   method='iterative'):
     """Runs the full simulation over T time steps.
 
+    The whole population is advanced at once with NumPy array operations. The
+    'iterative' method applies the logistic update step by step. The
+    'closed_form' method uses the fact that the update is linear in the score
+    gap to the ceiling, so that
+    score_t = ceiling - (ceiling - score_0) * prod_{k<=t}(1 - lr_k),
+    and computes every column with a single cumulative product.
+
     Args:
         initial_population_df (pandas.DataFrame): DataFrame with initial student data.
         group_assignments (dict): A dictionary mapping student_id to 'treatment' or 'control'.
@@ -78,28 +147,36 @@ def run_simulation(initial_population_df, group_assignments, t_steps, mastery_ce
         mastery_ceiling (float): The maximum possible score.
         boost (float): The intervention boost parameter.
         decay_rate (float): The intervention decay rate parameter.
+        method (str): Either 'iterative' or 'closed_form'.
 
     Returns:
         pandas.DataFrame: A DataFrame containing the score trajectory for each student over time.
     """
+    if method not in ('iterative', 'closed_form'):
+        raise ValueError("method must be 'iterative' or 'closed_form', got " + repr(method))
+
     n_students = len(initial_population_df)
-    scores = np.zeros((n_students, t_steps + 1))
+    lr_base = initial_population_df['lr_base'].to_numpy(dtype=float)
+    is_treated = (
+        initial_population_df['student_id'].map(group_assignments) == 'treatment'
+    ).to_numpy()
+    boost_schedule = calculate_boost_schedule(t_steps, boost, decay_rate)
+
+    scores = np.empty((n_students, t_steps + 1))
     scores[:, 0] = initial_population_df['initial_score']
 
-    for t in range(1, t_steps + 1):
-        for i in range(n_students):
-            student_id = initial_population_df.loc[i, 'student_id']
-            lr_base = initial_population_df.loc[i, 'lr_base']
-            is_treated = (group_assignments.get(student_id) == 'treatment')
-            
-            effective_lr = calculate_effective_lr(t, lr_base, is_treated, boost, decay_rate)
-            
-            current_score = scores[i, t - 1]
-            new_score = update_score(current_score, effective_lr, mastery_ceiling)
-            scores[i, t] = new_score
+    if method == 'iterative':
+        for t in range(1, t_steps + 1):
+            effective_lr = lr_base + np.where(is_treated, boost_schedule[t - 1], 0.0)
+            scores[:, t] = update_score(scores[:, t - 1], effective_lr, mastery_ceiling)
+    else:
+        # Column t - 1 of effective_lr holds the learning rate used at time step t.
+        effective_lr = lr_base[:, None] + np.outer(is_treated, boost_schedule)
+        remaining_gap = np.cumprod(1.0 - effective_lr, axis=1)
+        scores[:, 1:] = mastery_ceiling - (mastery_ceiling - scores[:, :1]) * remaining_gap
 
     time_columns = ['t_' + str(i) for i in range(t_steps + 1)]
-    results_df = pd.DataFrame(scores, columns=time_columns)
+    results_df = pd.DataFrame(scores, columns=time_columns, index=initial_population_df.index)
     final_df = pd.concat([initial_population_df, results_df], axis=1)
     
     return final_df
@@ -1,11 +1,54 @@
 import os
+import json
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
 import numpy as np
 import pandas as pd
-from scipy.stats import truncnorm
 
-def generate_initial_population(n_students, score_mean, score_std, score_min, score_max, lr_mean, lr_std, seed):
+from step_2 import sample_truncated_normal
+
+# Group labels indexed by the int8 assignment codes: 0 = Control, 1 = Treatment.
+GROUP_CATEGORIES = ['Control', 'Treatment']
+
+# Students per RNG block. Blocks, not workers, own the random streams, so a
+# population is bit-identical whatever the number of workers.
+POPULATION_BLOCK_SIZE = 100000
+
+
+def as_seed_sequence(seed):
+    """Wraps an integer seed in a SeedSequence; SeedSequences pass through."""
+    if isinstance(seed, np.random.SeedSequence):
+        return seed
+    return np.random.SeedSequence(seed)
+
+
+def spawn_generators(seed, n_streams):
+    """Spawns independent random generators from one seed.
+
+    Args:
+        seed (int or np.random.SeedSequence): Root seed.
+        n_streams (int): Number of independent streams.
+
+    Returns:
+        list: `n_streams` np.random.Generator objects.
+    """
+    return [np.random.default_rng(child) for child in as_seed_sequence(seed).spawn(n_streams)]
+
+
+def _generate_population_block(rng, n_students, score_mean, score_std, score_min, score_max, lr_mean, lr_std):
+    """Draws the initial scores and learning rates of one block of students."""
+    initial_scores = sample_truncated_normal(n_students, score_mean, score_std, score_min, score_max, rng)
+    learning_rates = rng.normal(loc=lr_mean, scale=lr_std, size=n_students)
+    return initial_scores, learning_rates
+
+
+def generate_initial_population(n_students, score_mean, score_std, score_min, score_max, lr_mean, lr_std, seed,
+                                n_workers=1):
     """Generates the initial population of students.
 
+    Students are drawn in blocks of POPULATION_BLOCK_SIZE, each from its own
+    stream spawned from `seed`, so blocks can be generated in parallel.
+
     Args:
         n_students (int): The number of students in the population.
         score_mean (float): The mean of the initial score distribution.
@@ -14,23 +57,28 @@ def generate_initial_population(n_students, score_mean, score_std, score_min, sc
         score_max (float): The maximum possible initial score.
         lr_mean (float): The mean of the baseline learning rate distribution.
         lr_std (float): The standard deviation of the baseline learning rate distribution.
-        seed (int): The random seed for reproducibility.
+        seed (int or np.random.SeedSequence): The random seed for reproducibility.
+        n_workers (int): Number of worker processes drawing blocks.
 
     Returns:
         pd.DataFrame: A DataFrame containing the initial state of the population,
                       with columns 'student_id', 'initial_score', and 'lr_base'.
     """
-    np.random.seed(seed)
+    block_sizes = [
+        min(POPULATION_BLOCK_SIZE, n_students - start) for start in range(0, n_students, POPULATION_BLOCK_SIZE)
+    ]
+    generators = spawn_generators(seed, len(block_sizes))
+    tasks = [
+        (rng, size, score_mean, score_std, score_min, score_max, lr_mean, lr_std) for rng, size in zip(generators, block_sizes)
+    ]
+    if n_workers > 1:
+        with ProcessPoolExecutor(n_workers) as executor:
+            blocks = list(executor.map(_generate_population_block, *zip(*tasks)))
+    else:
+        blocks = [_generate_population_block(*task) for task in tasks]
 
-    # Define bounds for the truncated normal distribution
-    a = (score_min - score_mean) / score_std
-    b = (score_max - score_mean) / score_std
-
-    initial_scores = truncnorm.rvs(
-        a, b, loc=score_mean, scale=score_std, size=n_students
-    )
-
-    learning_rates = np.random.normal(loc=lr_mean, scale=lr_std, size=n_students)
+    initial_scores = np.concatenate([block[0] for block in blocks]) if blocks else np.empty(0)
+    learning_rates = np.concatenate([block[1] for block in blocks]) if blocks else np.empty(0)
     # Ensure learning rates are non-negative
     learning_rates[learning_rates < 0] = 0
 
@@ -42,37 +90,243 @@ def generate_initial_population(n_students, score_mean, score_std, score_min, sc
 
     return population_df
 
-def run_simulation(initial_df, t_steps, mastery_ceiling, boost, decay_rate):
+def assign_targeted(initial_df, percentile):
+    """Selects the low achievers at or below a score percentile for treatment.
+
+    Args:
+        initial_df (pd.DataFrame or SharedPopulation): Population with an
+            'initial_score' column.
+        percentile (float): Percentile (0 to 1) defining the low-achiever threshold.
+
+    Returns:
+        np.ndarray: Boolean treatment mask.
+    """
+    initial_scores = np.asarray(initial_df['initial_score'])
+    low_achiever_threshold = pd.Series(initial_scores).quantile(percentile)
+    return initial_scores <= low_achiever_threshold
+
+
+def assign_random(initial_df, n_treatment, rng):
+    """Selects a simple random sample of students for treatment.
+
+    Args:
+        initial_df (pd.DataFrame): DataFrame of the population.
+        n_treatment (int): Number of students to treat.
+        rng (np.random.Generator): Generator drawing the sample.
+
+    Returns:
+        np.ndarray: Boolean treatment mask.
+    """
+    is_treatment = np.zeros(len(initial_df), dtype=bool)
+    is_treatment[rng.choice(len(initial_df), size=n_treatment, replace=False)] = True
+    return is_treatment
+
+
+class TrajectoryStore:
+    """Preallocated columnar storage for long-format score trajectories.
+
+    Scores are laid out time-major: the block for time step t is the
+    contiguous slice [t * n_students, (t + 1) * n_students). Identifiers,
+    group codes and time steps are stored once per student or per step and
+    only repeated when the long view is built; the wide view is a reshape of
+    the score buffer.
+
+    Attributes:
+        student_id (np.ndarray): int32 identifier of each student.
+        score (np.ndarray): float64 score for every record.
+        group_code (np.ndarray): int8 code into `group_categories` of each student.
+        group_categories (list): Group labels indexed by `group_code`.
+    """
+
+    def __init__(self, student_ids, group_codes, group_categories, t_steps):
+        """Allocates the columns for `len(student_ids)` students over `t_steps` steps.
+
+        Args:
+            student_ids (array-like): Identifier of each student.
+            group_codes (array-like): Integer group code of each student.
+            group_categories (list): Group labels indexed by the codes.
+            t_steps (int): The number of simulated time steps after t=0.
+        """
+        if t_steps > np.iinfo(np.int16).max:
+            raise ValueError("t_steps must fit in int16, got " + str(t_steps))
+
+        self.n_students = len(student_ids)
+        self.t_steps = t_steps
+        self.group_categories = list(group_categories)
+
+        self.student_id = np.array(student_ids, dtype=np.int32)
+        self.score = np.empty(self.n_students * (t_steps + 1), dtype=np.float64)
+        self.group_code = np.array(group_codes, dtype=np.int8)
+
+    def record(self, t, scores):
+        """Writes the scores of every student for time step t."""
+        self.score[t * self.n_students:(t + 1) * self.n_students] = scores
+
+    def to_long(self):
+        """Returns a long-format frame with 'student_id', 'time', 'score' and 'group'.
+
+        The 'score' column shares memory with the store; the per-student
+        identifiers and group codes are tiled across the time steps here.
+        """
+        n_times = self.t_steps + 1
+        return pd.DataFrame({
+            'student_id': np.tile(self.student_id, n_times),
+            'time': np.repeat(np.arange(n_times, dtype=np.int16), self.n_students),
+            'score': self.score,
+            'group': pd.Categorical.from_codes(np.tile(self.group_code, n_times), categories=self.group_categories),
+        }, copy=False)
+
+    def to_wide(self):
+        """Returns a wide view with one row per student and columns 't_0'..'t_T'.
+
+        The frame is indexed by ('student_id', 'group') and its values are a
+        transposed view of the score buffer.
+        """
+        n = self.n_students
+        index = pd.MultiIndex.from_arrays(
+            [self.student_id,
+             pd.Categorical.from_codes(self.group_code, categories=self.group_categories)],
+            names=['student_id', 'group']
+        )
+        columns = ['t_' + str(t) for t in range(self.t_steps + 1)]
+        return pd.DataFrame(self.score.reshape(self.t_steps + 1, n).T, index=index, columns=columns, copy=False)
+
+    def summarize(self, quantiles=(0.05, 0.5, 0.95)):
+        """Summarises the score distribution per group and time step.
+
+        Args:
+            quantiles (tuple): Quantiles (0 to 1) to include.
+
+        Returns:
+            pd.DataFrame: One row per ('group', 'time') with columns 'n', 'mean',
+                          'sem' and 'q_<quantile>' for each quantile.
+        """
+        n = self.n_students
+        scores = self.score.reshape(self.t_steps + 1, n)
+        codes = self.group_code
+        frames = []
+        for code, group in enumerate(self.group_categories):
+            group_scores = scores[:, codes == code]
+            n_group = group_scores.shape[1]
+            if n_group == 0:
+                continue
+            summary = pd.DataFrame({
+                'group': group,
+                'time': np.arange(self.t_steps + 1),
+                'n': n_group,
+                'mean': group_scores.mean(axis=1),
+                'sem': group_scores.std(axis=1, ddof=1) / np.sqrt(n_group) if n_group > 1 else np.nan,
+            })
+            for quantile, values in zip(quantiles, np.quantile(group_scores, quantiles, axis=1)):
+                summary['q_' + format(quantile, 'g')] = values
+            frames.append(summary)
+        return pd.concat(frames, ignore_index=True)
+
+
+class SharedPopulation:
+    """Read-only population columns held in one shared-memory block.
+
+    Any number of scenarios, in this process or in worker processes that
+    `attach` by name, can be simulated against the same block without
+    copying it. Columns are exposed by name like DataFrame columns.
+    """
+
+    COLUMNS = (('student_id', np.int32), ('initial_score', np.float64), ('lr_base', np.float64))
+
+    def __init__(self, shm, n_students, owner):
+        self._shm = shm
+        self._owner = owner
+        self.n_students = n_students
+        self.name = shm.name
+        self._columns = {}
+        offset = 0
+        for column, dtype in self.COLUMNS:
+            array = np.ndarray((n_students,), dtype=dtype, buffer=shm.buf, offset=offset)
+            array.flags.writeable = False
+            self._columns[column] = array
+            offset += array.nbytes
+
+    @classmethod
+    def from_frame(cls, population_df):
+        """Copies a population DataFrame into a new shared-memory block.
+
+        Args:
+            population_df (pd.DataFrame): DataFrame with 'student_id',
+                                          'initial_score' and 'lr_base' columns.
+
+        Returns:
+            SharedPopulation: The owning handle; call `unlink()` when done.
+        """
+        n_students = len(population_df)
+        size = sum(np.dtype(dtype).itemsize for _, dtype in cls.COLUMNS) * n_students
+        shm = shared_memory.SharedMemory(create=True, size=max(size, 1))
+        offset = 0
+        for column, dtype in cls.COLUMNS:
+            target = np.ndarray((n_students,), dtype=dtype, buffer=shm.buf, offset=offset)
+            target[:] = population_df[column].to_numpy()
+            offset += target.nbytes
+        return cls(shm, n_students, owner=True)
+
+    @classmethod
+    def attach(cls, name, n_students):
+        """Attaches to a block created by `from_frame` in another process."""
+        return cls(shared_memory.SharedMemory(name=name), n_students, owner=False)
+
+    def __getitem__(self, column):
+        return self._columns[column]
+
+    def __len__(self):
+        return self.n_students
+
+    def close(self):
+        """Releases this process's mapping of the block."""
+        self._columns = {}
+        self._shm.close()
+
+    def unlink(self):
+        """Closes and frees the block; only valid on the owning handle."""
+        self.close()
+        if self._owner:
+            self._shm.unlink()
+
+
+def run_simulation(initial_df, t_steps, mastery_ceiling, boost, decay_rate, group_codes=None):
     """Runs the learning simulation over a given number of time steps.
 
-    The initial_df must contain 'student_id', 'initial_score', 'lr_base', and 'group' columns.
+    The initial_df must contain 'student_id', 'initial_score' and 'lr_base'
+    columns, and a 'group' column unless `group_codes` is given.
 
     Args:
-        initial_df (pd.DataFrame): DataFrame with the initial state and group assignments.
+        initial_df (pd.DataFrame or SharedPopulation): The initial state of the population.
         t_steps (int): The number of time steps to simulate.
         mastery_ceiling (float): The maximum possible score (100%).
         boost (float): The initial boost applied to the learning rate for the treatment group.
         decay_rate (float): The rate at which the boost effect decays over time.
+        group_codes (np.ndarray): Optional int8 or boolean assignment vector
+                                  indexing GROUP_CATEGORIES. It lets several
+                                  scenarios share one unmodified population.
 
     Returns:
-        pd.DataFrame: A long-format DataFrame with simulation results, including
-                      'student_id', 'time', 'score', and 'group'.
+        TrajectoryStore: The simulated trajectories. Use `to_long()` for the
+                         'student_id', 'time', 'score', 'group' frame.
     """
-    records = []
+    if group_codes is None:
+        groups = pd.Categorical(initial_df['group'], categories=GROUP_CATEGORIES)
+        group_codes = groups.codes
+    group_codes = np.asarray(group_codes, dtype=np.int8)
+
+    store = TrajectoryStore(
+        student_ids=np.asarray(initial_df['student_id']),
+        group_codes=group_codes,
+        group_categories=GROUP_CATEGORIES,
+        t_steps=t_steps
+    )
 
     # Initial state at t=0
-    scores = initial_df['initial_score'].values.copy()
-    lr_base = initial_df['lr_base'].values
-    is_treatment = (initial_df['group'] == 'Treatment').values
-
-    # Store t=0 results
-    for i in range(len(initial_df)):
-        records.append({
-            'student_id': initial_df['student_id'].iloc[i],
-            'time': 0,
-            'score': scores[i],
-            'group': initial_df['group'].iloc[i]
-        })
+    scores = np.array(initial_df['initial_score'], dtype=np.float64)
+    lr_base = np.asarray(initial_df['lr_base'])
+    is_treatment = group_codes == GROUP_CATEGORIES.index('Treatment')
+    store.record(0, scores)
 
     # Simulate for t > 0
     for t in range(1, t_steps + 1):
@@ -83,18 +337,518 @@ def run_simulation(initial_df, t_steps, mastery_ceiling, boost, decay_rate):
 
         # Update scores
         scores += effective_lr * (mastery_ceiling - scores)
-        scores = np.clip(scores, 0, mastery_ceiling)
-
-        # Store results for the current time step
-        for i in range(len(initial_df)):
-            records.append({
-                'student_id': initial_df['student_id'].iloc[i],
-                'time': t,
-                'score': scores[i],
-                'group': initial_df['group'].iloc[i]
-            })
+        np.clip(scores, 0, mastery_ceiling, out=scores)
+
+        store.record(t, scores)
+
+    return store
+
+
+def _simulate_shared_scenario(name, n_students, group_codes, t_steps, mastery_ceiling, boost, decay_rate):
+    """Attaches to a shared population and simulates one scenario in a worker."""
+    population = SharedPopulation.attach(name, n_students)
+    try:
+        return run_simulation(population, t_steps, mastery_ceiling, boost, decay_rate, group_codes=group_codes)
+    finally:
+        population.close()
+
+
+def simulate_scenarios(population, assignments, t_steps, mastery_ceiling, boost, decay_rate, n_workers=1):
+    """Simulates several assignment scenarios against one shared population.
+
+    Args:
+        population (SharedPopulation): The shared, read-only population.
+        assignments (dict): Mapping of scenario name to an int8 or boolean
+                            assignment vector over the population.
+        t_steps (int): The number of time steps to simulate.
+        mastery_ceiling (float): The maximum possible score (100%).
+        boost (float): The initial boost applied to the learning rate for the treatment group.
+        decay_rate (float): The rate at which the boost effect decays over time.
+        n_workers (int): Number of worker processes; 1 simulates in-process.
+
+    Returns:
+        dict: Mapping of scenario name to TrajectoryStore.
+    """
+    if n_workers <= 1:
+        return {
+            scenario: run_simulation(population, t_steps, mastery_ceiling, boost, decay_rate, group_codes=codes)
+            for scenario, codes in assignments.items()
+        }
+
+    with ProcessPoolExecutor(n_workers) as executor:
+        futures = {
+            scenario: executor.submit(
+                _simulate_shared_scenario, population.name, population.n_students,
+                np.asarray(codes, dtype=np.int8), t_steps, mastery_ceiling, boost, decay_rate
+            )
+            for scenario, codes in assignments.items()
+        }
+        return {scenario: future.result() for scenario, future in futures.items()}
+
+
+def save_trajectory_stores(path, stores, dtype=np.float64):
+    """Saves scenario stores as a memory-mappable columnar trajectory directory.
+
+    The directory holds 'scores.npy' with shape (scenarios, T + 1, students),
+    so every time column of a scenario is one contiguous row, plus
+    'student_id.npy', 'group_code.npy' and a 'metadata.json' sidecar.
+
+    Args:
+        path (str): Destination directory.
+        stores (dict): Mapping of scenario name to TrajectoryStore. All stores
+                       must cover the same students and time steps.
+        dtype (np.dtype): Storage dtype of the scores, e.g. np.float32.
+    """
+    first = next(iter(stores.values()))
+    n_students, t_steps = first.n_students, first.t_steps
+    os.makedirs(path, exist_ok=True)
+
+    scores = np.lib.format.open_memmap(
+        os.path.join(path, 'scores.npy'), mode='w+', dtype=dtype,
+        shape=(len(stores), t_steps + 1, n_students)
+    )
+    group_codes = np.empty((len(stores), n_students), dtype=np.int8)
+    for i, store in enumerate(stores.values()):
+        if (store.n_students, store.t_steps) != (n_students, t_steps):
+            raise ValueError("All scenario stores must have the same shape.")
+        scores[i] = store.score.reshape(t_steps + 1, n_students)
+        group_codes[i] = store.group_code
+    scores.flush()
+    del scores
+
+    np.save(os.path.join(path, 'student_id.npy'), first.student_id)
+    np.save(os.path.join(path, 'group_code.npy'), group_codes)
+    metadata = {
+        'scenarios': list(stores),
+        'group_categories': [list(store.group_categories) for store in stores.values()],
+        'columns': ['t_' + str(t) for t in range(t_steps + 1)],
+        'n_students': n_students,
+        'dtype': np.dtype(dtype).name,
+    }
+    with open(os.path.join(path, 'metadata.json'), 'w') as f:
+        json.dump(metadata, f, indent=2)
+
+
+def open_trajectories(path, mmap=True):
+    """Opens a trajectory directory written by `save_trajectory_stores`.
+
+    Args:
+        path (str): Trajectory directory.
+        mmap (bool): Memory-map the score matrix instead of reading it.
+
+    Returns:
+        tuple[dict, np.ndarray, np.ndarray, np.ndarray]: The metadata, the
+            (scenarios, T + 1, students) score matrix, the student ids and the
+            (scenarios, students) group codes.
+    """
+    with open(os.path.join(path, 'metadata.json')) as f:
+        metadata = json.load(f)
+    scores = np.load(os.path.join(path, 'scores.npy'), mmap_mode='r' if mmap else None)
+    student_ids = np.load(os.path.join(path, 'student_id.npy'))
+    group_codes = np.load(os.path.join(path, 'group_code.npy'))
+    return metadata, scores, student_ids, group_codes
+
+
+def read_wide_trajectories(path, scenario, columns=None, mmap=True):
+    """Reads one scenario as a wide frame, touching only the requested columns.
+
+    Args:
+        path (str): Trajectory directory.
+        scenario (str): Scenario to read.
+        columns (list): Time columns to read, e.g. ['t_0', 't_20']. Defaults to all.
+        mmap (bool): Memory-map the score matrix instead of reading it.
+
+    Returns:
+        pd.DataFrame: One row per student indexed by ('student_id', 'group').
+    """
+    metadata, scores, student_ids, group_codes = open_trajectories(path, mmap=mmap)
+    s = metadata['scenarios'].index(scenario)
+    columns = metadata['columns'] if columns is None else list(columns)
+    rows = [metadata['columns'].index(column) for column in columns]
+
+    index = pd.MultiIndex.from_arrays(
+        [student_ids,
+         pd.Categorical.from_codes(group_codes[s], categories=metadata['group_categories'][s])],
+        names=['student_id', 'group']
+    )
+    return pd.DataFrame(np.asarray(scores[s, rows]).T, index=index, columns=columns)
+
+
+def load_trajectory_stores(path):
+    """Loads every scenario of a trajectory directory as a TrajectoryStore.
+
+    Args:
+        path (str): Trajectory directory.
+
+    Returns:
+        dict: Mapping of scenario name to TrajectoryStore.
+    """
+    metadata, scores, student_ids, group_codes = open_trajectories(path)
+    stores = {}
+    for s, scenario in enumerate(metadata['scenarios']):
+        store = TrajectoryStore(
+            student_ids=student_ids,
+            group_codes=group_codes[s],
+            group_categories=metadata['group_categories'][s],
+            t_steps=len(metadata['columns']) - 1
+        )
+        store.score = np.asarray(scores[s], dtype=np.float64).reshape(-1)
+        stores[scenario] = store
+    return stores
+
+
+def combine_scenarios(stores):
+    """Stacks the long views of several scenario stores into one frame.
+
+    Args:
+        stores (dict): Mapping of scenario name to TrajectoryStore.
+
+    Returns:
+        pd.DataFrame: Long-format frame with a categorical 'scenario' column.
+    """
+    frames = [store.to_long() for store in stores.values()]
+    combined = pd.concat(frames, ignore_index=True)
+    scenario_codes = np.repeat(
+        np.arange(len(frames), dtype=np.int8), [len(frame) for frame in frames]
+    )
+    combined['scenario'] = pd.Categorical.from_codes(scenario_codes, categories=list(stores))
+    return combined
+
+
+def summarize_scenarios(stores, quantiles=(0.05, 0.5, 0.95)):
+    """Builds the per-time summary table of several scenario stores.
+
+    Args:
+        stores (dict): Mapping of scenario name to TrajectoryStore.
+        quantiles (tuple): Quantiles (0 to 1) to include.
+
+    Returns:
+        pd.DataFrame: `TrajectoryStore.summarize` rows with a 'scenario' column.
+    """
+    frames = []
+    for scenario, store in stores.items():
+        summary = store.summarize(quantiles)
+        summary.insert(0, 'scenario', scenario)
+        frames.append(summary)
+    return pd.concat(frames, ignore_index=True)
+
+
+def load_simulation_data(data_path):
+    """Loads simulation output written by this step as a long-format frame.
+
+    Args:
+        data_path (str): Path to a trajectory directory or a legacy CSV file.
+
+    Returns:
+        pd.DataFrame: Frame with 'student_id', 'time', 'score', 'group' and 'scenario'.
+    """
+    if os.path.isdir(data_path):
+        return combine_scenarios(load_trajectory_stores(data_path))
+    return pd.read_csv(data_path)
+
+
+def _simulate_moments(initial_scores, lr_base, t_steps, mastery_ceiling, boosts, decay_rates):
+    """Simulates one cohort under P parameter sets and returns per-step moments.
+
+    Scores are advanced as a [params x students] slab, so the time axis of
+    the [params x students x time] tensor is never materialised.
+
+    Args:
+        initial_scores (np.ndarray): Initial scores of the cohort, shape (N,).
+        lr_base (np.ndarray): Baseline learning rates of the cohort, shape (N,).
+        t_steps (int): The number of time steps to simulate.
+        mastery_ceiling (float): The maximum possible score.
+        boosts (np.ndarray): Boost of each parameter set, shape (P,).
+        decay_rates (np.ndarray): Decay rate of each parameter set, shape (P,).
+
+    Returns:
+        tuple[np.ndarray, np.ndarray]: Mean and sample variance of the scores,
+                                       each of shape (P, t_steps + 1).
+    """
+    boosts = np.asarray(boosts, dtype=float)[:, None]
+    decay_rates = np.asarray(decay_rates, dtype=float)[:, None]
+    scores = np.repeat(initial_scores[None, :], len(boosts), axis=0)
+
+    means = np.empty((len(boosts), t_steps + 1))
+    variances = np.empty((len(boosts), t_steps + 1))
+    means[:, 0] = scores.mean(axis=1)
+    variances[:, 0] = scores.var(axis=1, ddof=1) if scores.shape[1] > 1 else np.nan
+
+    for t in range(1, t_steps + 1):
+        effective_lr = lr_base + boosts * np.exp(-decay_rates * (t - 1))
+        scores += effective_lr * (mastery_ceiling - scores)
+        np.clip(scores, 0, mastery_ceiling, out=scores)
+        means[:, t] = scores.mean(axis=1)
+        variances[:, t] = scores.var(axis=1, ddof=1) if scores.shape[1] > 1 else np.nan
+
+    return means, variances
+
+
+def _cohens_d_from_moments(n_treatment, mean_treatment, var_treatment, n_control, mean_control, var_control):
+    """Computes Cohen's d from group sizes, means and sample variances.
+
+    Follows the conventions of step_4.cohens_d: NaN when a group is too small
+    and 0.0 when the pooled standard deviation is zero.
+    """
+    if n_treatment < 2 or n_control < 2:
+        return np.full(np.broadcast(mean_treatment, mean_control).shape, np.nan)
+    pooled_std = np.sqrt(
+        ((n_treatment - 1) * var_treatment + (n_control - 1) * var_control) / (n_treatment + n_control - 2)
+    )
+    with np.errstate(invalid='ignore', divide='ignore'):
+        d = (mean_treatment - mean_control) / pooled_std
+    return np.where(pooled_std == 0, 0.0, d)
+
+
+def simulate_effect_size_curves(initial_scores, lr_base, is_treatment, t_steps, mastery_ceiling, boosts, decay_rates):
+    """Returns the Cohen's d curve of every (boost, decay_rate) pair.
+
+    Control students never receive the boost, so their trajectories are
+    simulated once and shared by all parameter sets.
+
+    Args:
+        initial_scores (np.ndarray): Initial score of every student.
+        lr_base (np.ndarray): Baseline learning rate of every student.
+        is_treatment (np.ndarray): Boolean treatment mask.
+        t_steps (int): The number of time steps to simulate.
+        mastery_ceiling (float): The maximum possible score.
+        boosts (array-like): Boost of each parameter set, shape (P,).
+        decay_rates (array-like): Decay rate of each parameter set, shape (P,).
+
+    Returns:
+        np.ndarray: Cohen's d per parameter set and time step, shape (P, t_steps + 1).
+    """
+    is_treatment = np.asarray(is_treatment, dtype=bool)
+    treated_means, treated_vars = _simulate_moments(
+        initial_scores[is_treatment], lr_base[is_treatment], t_steps, mastery_ceiling, boosts, decay_rates
+    )
+    control_means, control_vars = _simulate_moments(
+        initial_scores[~is_treatment], lr_base[~is_treatment], t_steps, mastery_ceiling, [0.0], [0.0]
+    )
+    return _cohens_d_from_moments(
+        is_treatment.sum(), treated_means, treated_vars,
+        (~is_treatment).sum(), control_means, control_vars
+    )
+
+
+_SWEEP_COHORT = {}
+
+
+def _init_sweep_worker(initial_scores, lr_base, is_treatment, t_steps, mastery_ceiling):
+    """Keeps the cohort in each worker so shards only carry their parameters."""
+    _SWEEP_COHORT.update(
+        initial_scores=initial_scores, lr_base=lr_base, is_treatment=is_treatment,
+        t_steps=t_steps, mastery_ceiling=mastery_ceiling
+    )
+
+
+def _run_sweep_shard(params):
+    """Simulates one shard of (boost, decay_rate) pairs in a worker process."""
+    return simulate_effect_size_curves(boosts=params[:, 0], decay_rates=params[:, 1], **_SWEEP_COHORT)
+
+
+def run_parameter_sweep(initial_df, t_steps, mastery_ceiling, boosts, decay_rates, shard_size=64, n_workers=1):
+    """Computes Cohen's d curves over the full grid of boost and decay_rate values.
+
+    The initial_df must contain 'initial_score', 'lr_base', and 'group' columns.
+    The grid is split into shards of `shard_size` parameter sets, each simulated
+    in one vectorized pass; with n_workers > 1 the shards run in a process pool.
+
+    Args:
+        initial_df (pd.DataFrame): DataFrame with the initial state and group assignments.
+        t_steps (int): The number of time steps to simulate.
+        mastery_ceiling (float): The maximum possible score (100%).
+        boosts (array-like): Boost values of the grid.
+        decay_rates (array-like): Decay rate values of the grid.
+        shard_size (int): Number of parameter sets simulated per pass.
+        n_workers (int): Number of worker processes.
+
+    Returns:
+        pd.DataFrame: Cohen's d indexed by ('boost', 'decay_rate') with
+                      columns 't_0'..'t_T'.
+    """
+    grid = pd.MultiIndex.from_product([boosts, decay_rates], names=['boost', 'decay_rate'])
+    params = np.column_stack([grid.get_level_values(0), grid.get_level_values(1)]).astype(float)
+    shards = [params[i:i + shard_size] for i in range(0, len(params), shard_size)]
+
+    cohort = (
+        initial_df['initial_score'].to_numpy(dtype=float),
+        initial_df['lr_base'].to_numpy(dtype=float),
+        (initial_df['group'] == 'Treatment').to_numpy(),
+        t_steps,
+        mastery_ceiling
+    )
+    if n_workers > 1:
+        with ProcessPoolExecutor(n_workers, initializer=_init_sweep_worker, initargs=cohort) as executor:
+            curves = list(executor.map(_run_sweep_shard, shards))
+    else:
+        _init_sweep_worker(*cohort)
+        curves = [_run_sweep_shard(shard) for shard in shards]
+
+    columns = ['t_' + str(t) for t in range(t_steps + 1)]
+    return pd.DataFrame(np.vstack(curves), index=grid, columns=columns)
+
+
+class EffectSizeBands:
+    """Streaming summary of effect-size curves across Monte Carlo replications.
+
+    Each curve updates a running mean and variance (Welford) and one P-square
+    quantile estimator (Jain & Chlamtac, 1985) per quantile and time step, so
+    memory depends only on the number of time steps and quantiles.
+    """
+
+    def __init__(self, n_steps, quantiles=(0.05, 0.5, 0.95)):
+        """Initialises empty accumulators.
+
+        Args:
+            n_steps (int): Length of each curve.
+            quantiles (tuple): Quantiles (0 to 1) to track.
+        """
+        self.quantiles = np.asarray(quantiles, dtype=float)
+        self.count = 0
+        self.mean = np.zeros(n_steps)
+        self._m2 = np.zeros(n_steps)
+
+        # P-square markers, shape (5, n_quantiles, n_steps).
+        q = self.quantiles[:, None]
+        self._increments = np.stack([np.zeros_like(q), q / 2, q, (1 + q) / 2, np.ones_like(q)])
+        shape = (5, len(self.quantiles), n_steps)
+        self._heights = np.empty(shape)
+        self._positions = np.broadcast_to(np.arange(1.0, 6.0)[:, None, None], shape).copy()
+        self._desired = np.broadcast_to(1 + 4 * self._increments, shape).copy()
+
+    def update(self, curve):
+        """Adds one replication's effect-size curve."""
+        curve = np.asarray(curve, dtype=float)
+        self.count += 1
+        delta = curve - self.mean
+        self.mean += delta / self.count
+        self._m2 += delta * (curve - self.mean)
+
+        if self.count <= 5:
+            self._heights[self.count - 1] = curve
+            if self.count == 5:
+                self._heights.sort(axis=0)
+            return
+        self._update_markers(curve)
+
+    def _update_markers(self, curve):
+        q, n = self._heights, self._positions
+        x = np.broadcast_to(curve, q.shape[1:])
+
+        q[0] = np.minimum(q[0], x)
+        q[4] = np.maximum(q[4], x)
+        cell = (q[1:4] <= x).sum(axis=0)
+        n += np.arange(5)[:, None, None] > cell
+        self._desired += self._increments
+
+        for i in (1, 2, 3):
+            d = self._desired[i] - n[i]
+            step = np.where((d >= 1) & (n[i + 1] - n[i] > 1), 1.0,
+                            np.where((d <= -1) & (n[i - 1] - n[i] < -1), -1.0, 0.0))
+            if not step.any():
+                continue
+            parabolic = q[i] + step / (n[i + 1] - n[i - 1]) * (
+                (n[i] - n[i - 1] + step) * (q[i + 1] - q[i]) / (n[i + 1] - n[i])
+                + (n[i + 1] - n[i] - step) * (q[i] - q[i - 1]) / (n[i] - n[i - 1])
+            )
+            neighbour_q = np.where(step > 0, q[i + 1], q[i - 1])
+            neighbour_n = np.where(step > 0, n[i + 1], n[i - 1])
+            linear = q[i] + step * (neighbour_q - q[i]) / (neighbour_n - n[i])
+            adjusted = np.where((q[i - 1] < parabolic) & (parabolic < q[i + 1]), parabolic, linear)
+            q[i] = np.where(step != 0, adjusted, q[i])
+            n[i] += step
+
+    def summary(self):
+        """Returns the bands as a DataFrame.
+
+        Returns:
+            pd.DataFrame: One row per time step with columns 'time', 'n',
+                          'mean', 'std' and 'q_<quantile>' for each quantile.
+        """
+        if self.count == 0:
+            raise ValueError("No curves have been added.")
+        if self.count < 5:
+            estimates = np.quantile(self._heights[:self.count, 0], self.quantiles, axis=0)
+        else:
+            estimates = self._heights[2]
+
+        summary = pd.DataFrame({
+            'time': np.arange(len(self.mean)),
+            'n': self.count,
+            'mean': self.mean,
+            'std': np.sqrt(self._m2 / (self.count - 1)) if self.count > 1 else np.nan,
+        })
+        for quantile, estimate in zip(self.quantiles, estimates):
+            summary['q_' + format(quantile, 'g')] = estimate
+        return summary
+
+
+def run_replications(n_replications, n_students, t_steps, mastery_ceiling, score_mean, score_std,
+                     lr_mean, lr_std, boost, decay_rate, percentile=0.25, base_seed=42,
+                     quantiles=(0.05, 0.5, 0.95)):
+    """Replicates the targeted-vs-general comparison over many seeds.
+
+    Each replication gets its own pair of streams spawned from `base_seed`,
+    one for the population and one for the general-population sample. Only the
+    per-step Cohen's d of each scenario is kept, and it is streamed straight
+    into an EffectSizeBands accumulator.
+
+    Args:
+        n_replications (int): Number of Monte Carlo replications.
+        n_students (int): The number of students in each population.
+        t_steps (int): The number of time steps to simulate.
+        mastery_ceiling (float): The maximum possible score.
+        score_mean (float): The mean of the initial score distribution.
+        score_std (float): The standard deviation of the initial score distribution.
+        lr_mean (float): The mean of the baseline learning rate distribution.
+        lr_std (float): The standard deviation of the baseline learning rate distribution.
+        boost (float): The initial boost applied to the learning rate for the treatment group.
+        decay_rate (float): The rate at which the boost effect decays over time.
+        percentile (float): Low-achiever percentile defining the targeted group.
+        base_seed (int or np.random.SeedSequence): Root seed of all replications.
+        quantiles (tuple): Quantiles of the effect-size bands.
+
+    Returns:
+        pd.DataFrame: Effect-size bands per 'scenario' and 'time'.
+    """
+    bands = {
+        'Targeted': EffectSizeBands(t_steps + 1, quantiles),
+        'General Population': EffectSizeBands(t_steps + 1, quantiles),
+    }
+
+    replication_seeds = as_seed_sequence(base_seed).spawn(n_replications)
+    for replication_seed in replication_seeds:
+        population_seed, assignment_seed = replication_seed.spawn(2)
+        population = generate_initial_population(
+            n_students=n_students,
+            score_mean=score_mean,
+            score_std=score_std,
+            score_min=0,
+            score_max=mastery_ceiling,
+            lr_mean=lr_mean,
+            lr_std=lr_std,
+            seed=population_seed
+        )
+        initial_scores = population['initial_score'].to_numpy()
+        lr_base = population['lr_base'].to_numpy()
+
+        targeted = assign_targeted(population, percentile)
+        general = assign_random(population, targeted.sum(), np.random.default_rng(assignment_seed))
+
+        for scenario, is_treatment in (('Targeted', targeted), ('General Population', general)):
+            curve = simulate_effect_size_curves(
+                initial_scores, lr_base, is_treatment, t_steps, mastery_ceiling, [boost], [decay_rate]
+            )
+            bands[scenario].update(curve[0])
+
+    frames = []
+    for scenario, accumulator in bands.items():
+        summary = accumulator.summary()
+        summary.insert(0, 'scenario', scenario)
+        frames.append(summary)
+    return pd.concat(frames, ignore_index=True)
 
-    return pd.DataFrame(records)
 
 if __name__ == '__main__':
     # 1. Regenerate Initial Population
@@ -108,6 +862,10 @@ if __name__ == '__main__':
     BOOST = 0.15
     DECAY_RATE = 0.25
     SEED = 42
+    N_REPLICATIONS = 100
+
+    # Independent streams for the population, the RCT sample and the replications
+    population_seed, assignment_seed, replication_seed = np.random.SeedSequence(SEED).spawn(3)
 
     initial_population = generate_initial_population(
         n_students=N_STUDENTS,
@@ -117,61 +875,61 @@ if __name__ == '__main__':
         score_max=MASTERY_CEILING,
         lr_mean=LR_BASE_MEAN,
         lr_std=LR_BASE_STD,
-        seed=SEED
+        seed=population_seed
     )
 
-    # 2. Execute Scenario A (Targeted Intervention)
-    low_achiever_threshold = initial_population['initial_score'].quantile(0.25)
-    
-    pop_scenario_a = initial_population.copy()
-    pop_scenario_a['group'] = np.where(
-        pop_scenario_a['initial_score'] <= low_achiever_threshold,
-        'Treatment',
-        'Control'
-    )
+    # 2. Scenario A (Targeted Intervention): treat the low achievers
+    targeted = assign_targeted(initial_population, 0.25)
 
-    results_targeted = run_simulation(
-        initial_df=pop_scenario_a,
-        t_steps=T_STEPS,
-        mastery_ceiling=MASTERY_CEILING,
-        boost=BOOST,
-        decay_rate=DECAY_RATE
-    )
-    results_targeted['scenario'] = 'Targeted'
-
-    # 3. Execute Scenario B (General Population RCT)
-    num_treatment_a = (pop_scenario_a['group'] == 'Treatment').sum()
-    
-    pop_scenario_b = initial_population.copy()
-    
-    # Randomly assign the same number of students to treatment
-    treatment_ids = pop_scenario_b.sample(
-        n=num_treatment_a, random_state=123
-    ).index
-
-    pop_scenario_b['group'] = 'Control'
-    pop_scenario_b.loc[treatment_ids, 'group'] = 'Treatment'
-
-    results_general = run_simulation(
-        initial_df=pop_scenario_b,
-        t_steps=T_STEPS,
-        mastery_ceiling=MASTERY_CEILING,
-        boost=BOOST,
-        decay_rate=DECAY_RATE
-    )
-    results_general['scenario'] = 'General Population'
+    # 3. Scenario B (General Population RCT): randomly treat the same number of students
+    general = assign_random(initial_population, targeted.sum(), np.random.default_rng(assignment_seed))
 
-    # 4. Combine and Save
-    combined_results = pd.concat([results_targeted, results_general], ignore_index=True)
+    # 4. Simulate both scenarios against one shared, read-only population
+    shared_population = SharedPopulation.from_frame(initial_population)
+    try:
+        stores = simulate_scenarios(
+            shared_population,
+            {'Targeted': targeted.astype(np.int8), 'General Population': general.astype(np.int8)},
+            t_steps=T_STEPS,
+            mastery_ceiling=MASTERY_CEILING,
+            boost=BOOST,
+            decay_rate=DECAY_RATE
+        )
+    finally:
+        shared_population.unlink()
 
+    # 5. Save
     output_dir = '/work_dir/data/'
-    output_path = os.path.join(output_dir, 'simulation_data.csv')
+    output_path = os.path.join(output_dir, 'simulation_data')
 
     # Ensure the output directory exists
     os.makedirs(output_dir, exist_ok=True)
 
-    combined_results.to_csv(output_path, index=False)
+    save_trajectory_stores(output_path, stores)
+    combined_results = combine_scenarios(stores)
+
+    summary_path = os.path.join(output_dir, 'trajectory_summary.csv')
+    summarize_scenarios(stores).to_csv(summary_path, index=False)
+    print('Trajectory summary table saved to ' + summary_path)
 
     print('--- Combined Simulation Data ---')
     print(combined_results.head())
     print('\nShape of the combined DataFrame: ' + str(combined_results.shape))
+
+    # 6. Monte Carlo replications of both scenarios
+    bands = run_replications(
+        n_replications=N_REPLICATIONS,
+        n_students=N_STUDENTS,
+        t_steps=T_STEPS,
+        mastery_ceiling=MASTERY_CEILING,
+        score_mean=SCORE_MEAN,
+        score_std=SCORE_STD,
+        lr_mean=LR_BASE_MEAN,
+        lr_std=LR_BASE_STD,
+        boost=BOOST,
+        decay_rate=DECAY_RATE,
+        base_seed=replication_seed
+    )
+    bands_path = os.path.join(output_dir, 'effect_size_bands.csv')
+    bands.to_csv(bands_path, index=False)
+    print('\nEffect-size bands over ' + str(N_REPLICATIONS) + ' replications saved to ' + bands_path)
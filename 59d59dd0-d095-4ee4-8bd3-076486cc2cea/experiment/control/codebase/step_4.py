@@ -2,6 +2,8 @@ import pandas as pd
 import numpy as np
 import os
 
+from step_3 import open_trajectories
+
 def cohens_d(treatment_scores, control_scores):
     """
     Calculates Cohen's d for independent samples.
@@ -51,25 +53,120 @@ def cohens_d(treatment_scores, control_scores):
     d = (mean_treatment - mean_control) / pooled_std
     return d
 
+class GroupedMoments:
+    """Running count, mean and M2 (sum of squared deviations) per group.
+
+    Chunks are reduced with one groupby pass each and merged into the
+    running statistics with Chan et al.'s parallel update, so data can be
+    ingested piecewise, e.g. one time step at a time while a simulation is
+    still running.
+    """
+
+    def __init__(self, keys, arm, value):
+        """Creates an empty accumulator.
+
+        Args:
+            keys (list): Columns identifying a comparison, e.g. ['scenario', 'time_step'].
+            arm (str): Column holding the treatment/control label.
+            value (str): Column holding the outcome.
+        """
+        self.keys = list(keys)
+        self.arm = arm
+        self.value = value
+        self.stats = None
+
+    def update(self, chunk):
+        """Merges the moments of a DataFrame chunk into the running statistics.
+
+        Args:
+            chunk (pd.DataFrame): Rows containing the key, arm and value columns.
+        """
+        grouped = chunk.groupby(self.keys + [self.arm], observed=True)[self.value]
+        batch = grouped.agg(['count', 'mean', 'var']).rename(columns={'count': 'n'})
+        batch['m2'] = batch['var'].fillna(0.0) * (batch['n'] - 1)
+        batch = batch[['n', 'mean', 'm2']].astype(float)
+
+        if self.stats is None:
+            self.stats = batch
+            return
+
+        index = self.stats.index.union(batch.index)
+        a = self.stats.reindex(index, fill_value=0.0)
+        b = batch.reindex(index, fill_value=0.0)
+        n = a['n'] + b['n']
+        delta = b['mean'] - a['mean']
+        self.stats = pd.DataFrame({
+            'n': n,
+            'mean': a['mean'] + delta * b['n'] / n,
+            'm2': a['m2'] + b['m2'] + delta ** 2 * a['n'] * b['n'] / n,
+        })
+
+    def cohens_d(self, treatment='Treatment', control='Control'):
+        """Computes Cohen's d for every key combination at once.
+
+        Uses the same conventions as `cohens_d`: NaN when either arm has
+        fewer than two observations, 0.0 when the pooled standard deviation
+        is zero.
+
+        Args:
+            treatment (str): Arm label of the treatment group.
+            control (str): Arm label of the control group.
+
+        Returns:
+            pd.Series: Cohen's d indexed by the key columns.
+        """
+        stats = self.stats.unstack(self.arm)
+        n_t, n_c = stats[('n', treatment)].fillna(0), stats[('n', control)].fillna(0)
+        pooled_var = (stats[('m2', treatment)] + stats[('m2', control)]) / (n_t + n_c - 2)
+        d = (stats[('mean', treatment)] - stats[('mean', control)]) / np.sqrt(pooled_var)
+        d = d.where(pooled_var != 0, 0.0)
+        return d.where((n_t >= 2) & (n_c >= 2))
+
+
+def iter_simulation_chunks(data_path, chunksize=1000000):
+    """Yields the simulation output as long-format chunks.
+
+    Trajectory directories are streamed one memory-mapped time column at a
+    time, so only a single column of scores is resident at once.
+
+    Args:
+        data_path (str): Path to a trajectory directory or a legacy CSV file.
+        chunksize (int): Rows per chunk when reading a CSV file.
+
+    Yields:
+        pd.DataFrame: Chunks with 'scenario', 'time_step', 'group' and 'score' columns.
+    """
+    if os.path.isdir(data_path):
+        metadata, scores, _, group_codes = open_trajectories(data_path)
+        for s, scenario in enumerate(metadata['scenarios']):
+            groups = pd.Categorical.from_codes(group_codes[s], categories=metadata['group_categories'][s])
+            for t in range(scores.shape[1]):
+                yield pd.DataFrame({
+                    'scenario': scenario,
+                    'time_step': t,
+                    'group': groups,
+                    'score': scores[s, t],
+                })
+    else:
+        for chunk in pd.read_csv(data_path, chunksize=chunksize):
+            yield chunk.rename(columns={'time': 'time_step'})
+
+
 def analyze_effect_sizes(data_path, output_path):
     """
     Loads simulation data, calculates Cohen's d for each time step and scenario,
     saves the results, and prints a verification summary.
 
     Args:
-        data_path (str): The path to the input CSV file ('simulation_data.csv').
+        data_path (str): The path to the simulation output (the 'simulation_data'
+                         trajectory directory or a legacy 'simulation_data.csv').
         output_path (str): The path to save the resulting effect size CSV file.
     """
-    df = pd.read_csv(data_path)
-
-    def calculate_d_for_group(group):
-        treatment = group[group['group'] == 'Treatment']['score']
-        control = group[group['group'] == 'Control']['score']
-        return cohens_d(treatment, control)
-
-    effect_sizes = df.groupby(['scenario', 'time_step']).apply(calculate_d_for_group)
+    moments = GroupedMoments(keys=['scenario', 'time_step'], arm='group', value='score')
+    for chunk in iter_simulation_chunks(data_path):
+        moments.update(chunk)
 
-    effect_size_df = effect_sizes.reset_index(name='cohens_d')
+    effect_size_df = moments.cohens_d().reset_index(name='cohens_d')
 
     effect_size_df.to_csv(output_path, index=False)
     print("Effect size data saved to " + output_path)
@@ -82,12 +179,12 @@ def analyze_effect_sizes(data_path, output_path):
             max_d_row = scenario_df.loc[scenario_df['cohens_d'].idxmax()]
             max_d = max_d_row['cohens_d']
             time_step = max_d_row['time_step']
-            print("Scenario '" + scenario + "': Max Cohen's d = " + str(max_d) + " at time step " + str(int(time_step)))
+            print("Scenario '" + str(scenario) + "': Max Cohen's d = " + str(max_d) + " at time step " + str(int(time_step)))
         else:
-            print("No data found for scenario: " + scenario)
+            print("No data found for scenario: " + str(scenario))
 
 if __name__ == '__main__':
-    input_file_path = '/work_dir/data/simulation_data.csv'
+    input_file_path = '/work_dir/data/simulation_data'
     output_file_path = '/work_dir/data/effect_size_results.csv'
 
     os.makedirs('/work_dir/data', exist_ok=True)
@@ -1,30 +1,55 @@
 import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
 import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
 
 
-def create_effect_size_plot(data_path: str, output_path: str):
+@lru_cache(maxsize=None)
+def load_plotting():
+    """Imports matplotlib with the non-interactive Agg backend, plus seaborn, once per process.
+
+    Returns:
+        tuple: The `matplotlib.pyplot` and `seaborn` modules.
+    """
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+    sns.set_theme(style="whitegrid")
+    return plt, sns
+
+
+def create_effect_size_plot(data_path: str, output_path: str, bands_path: str = None):
     """Loads effect size data and creates a line plot of Cohen's d vs. Time.
 
     Args:
         data_path (str): The path to the input CSV file ('effect_size_results.csv').
         output_path (str): The path to save the output PNG plot.
+        bands_path (str): Optional path to 'effect_size_bands.csv'; when given,
+                          the 5%-95% replication band of each scenario is shaded.
     """
     df_effect = pd.read_csv(data_path)
 
-    sns.set_theme(style="whitegrid")
+    plt, sns = load_plotting()
     fig, ax = plt.subplots(figsize=(10, 6))
 
     sns.lineplot(
         data=df_effect,
-        x='time',
-        y='cohen_d',
+        x='time_step',
+        y='cohens_d',
         hue='scenario',
         marker='o',
+        errorbar=None,
         ax=ax
     )
 
+    if bands_path is not None:
+        df_bands = pd.read_csv(bands_path)
+        colors = dict(zip(*reversed(ax.get_legend_handles_labels())))
+        for scenario, band in df_bands.groupby('scenario'):
+            ax.fill_between(band['time'], band['q_0.05'], band['q_0.95'],
+                            color=colors[scenario].get_color(), alpha=0.2, linewidth=0)
+
     ax.set_title("Effect Size (Cohen's d) Over Time by Scenario", fontsize=16)
     ax.set_xlabel("Time Step", fontsize=12)
     ax.set_ylabel("Cohen's d", fontsize=12)
@@ -37,31 +62,39 @@ def create_effect_size_plot(data_path: str, output_path: str):
 
 
 def create_learning_trajectories_plot(data_path: str, output_path: str):
-    """Loads simulation data and plots average learning trajectories for subgroups.
+    """Loads the trajectory summary table and plots average learning trajectories for subgroups.
+
+    The summary table is produced by the simulation step, so rendering cost
+    does not depend on the number of simulated students. Each line is shaded
+    with its 95% confidence interval for the mean.
 
     Args:
-        data_path (str): The path to the input CSV file ('simulation_data.csv').
+        data_path (str): The path to the input CSV file ('trajectory_summary.csv').
         output_path (str): The path to save the output PNG plot.
     """
-    df_sim = pd.read_csv(data_path)
-
-    avg_scores = df_sim.groupby(['time', 'scenario', 'group'])['score'].mean().reset_index()
+    avg_scores = pd.read_csv(data_path)
     avg_scores['subgroup'] = avg_scores['scenario'] + ' - ' + avg_scores['group']
 
-    sns.set_theme(style="whitegrid")
+    plt, sns = load_plotting()
     fig, ax = plt.subplots(figsize=(12, 8))
 
     sns.lineplot(
         data=avg_scores,
         x='time',
-        y='score',
+        y='mean',
         hue='subgroup',
         style='scenario',
         markers=True,
         dashes=False,
+        errorbar=None,
         ax=ax
     )
 
+    colors = dict(zip(*reversed(ax.get_legend_handles_labels())))
+    for subgroup, rows in avg_scores.groupby('subgroup'):
+        ax.fill_between(rows['time'], rows['mean'] - 1.96 * rows['sem'], rows['mean'] + 1.96 * rows['sem'],
+                        color=colors[subgroup].get_color(), alpha=0.2, linewidth=0)
+
     ax.set_title('Average Learning Trajectories by Subgroup', fontsize=16)
     ax.set_xlabel('Time Step', fontsize=12)
     ax.set_ylabel('Average Score', fontsize=12)
@@ -79,7 +112,8 @@ def main():
     PLOTS_DIR = "/work_dir/plots"
 
     EFFECT_SIZE_FILE = os.path.join(DATA_DIR, "effect_size_results.csv")
-    SIMULATION_DATA_FILE = os.path.join(DATA_DIR, "simulation_data.csv")
+    EFFECT_SIZE_BANDS_FILE = os.path.join(DATA_DIR, "effect_size_bands.csv")
+    TRAJECTORY_SUMMARY_FILE = os.path.join(DATA_DIR, "trajectory_summary.csv")
 
     EFFECT_SIZE_PLOT_FILE = os.path.join(PLOTS_DIR, "effect_size_over_time.png")
     TRAJECTORIES_PLOT_FILE = os.path.join(PLOTS_DIR, "learning_trajectories.png")
@@ -88,15 +122,23 @@ def main():
 
     print("Step 5: Visualizing simulation results.")
 
-    create_effect_size_plot(
-        data_path=EFFECT_SIZE_FILE,
-        output_path=EFFECT_SIZE_PLOT_FILE
-    )
-
-    create_learning_trajectories_plot(
-        data_path=SIMULATION_DATA_FILE,
-        output_path=TRAJECTORIES_PLOT_FILE
-    )
+    # The figures are independent, so they are rendered in separate processes.
+    with ProcessPoolExecutor(max_workers=2) as executor:
+        futures = [
+            executor.submit(
+                create_effect_size_plot,
+                data_path=EFFECT_SIZE_FILE,
+                output_path=EFFECT_SIZE_PLOT_FILE,
+                bands_path=EFFECT_SIZE_BANDS_FILE if os.path.exists(EFFECT_SIZE_BANDS_FILE) else None
+            ),
+            executor.submit(
+                create_learning_trajectories_plot,
+                data_path=TRAJECTORY_SUMMARY_FILE,
+                output_path=TRAJECTORIES_PLOT_FILE
+            ),
+        ]
+        for future in futures:
+            future.result()
 
     print("Visualization step complete.")
 
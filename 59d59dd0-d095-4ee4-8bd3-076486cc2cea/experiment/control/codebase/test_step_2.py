@@ -0,0 +1,45 @@
+"""Deterministic tests of the truncated-normal sampler in step_2.
+
+Run with `python -m pytest test_step_2.py`.
+"""
+import numpy as np
+from scipy.stats import truncnorm
+from step_2 import sample_truncated_normal
+
+# (mean, sd, low, upp, mirrored): the body of the distribution, both mirrored
+# and unmirrored bounds, and intervals deep enough in the tail to need the
+# log-space inversion.
+CASES = [
+    (50.0, 15.0, 0.0, 100.0, False),
+    (50.0, 15.0, 80.0, 100.0, True),
+    (0.0, 1.0, -40.0, -30.0, False),
+    (0.0, 1.0, 30.0, 40.0, True),
+]
+
+
+def test_matches_inverse_cdf_on_the_same_uniforms():
+    for mean, sd, low, upp, mirrored in CASES:
+        a, b = (low - mean) / sd, (upp - mean) / sd
+        u = np.random.default_rng(7).random(1000)
+        # Mirrored bounds invert the CDF of the reflected distribution, so draw u maps to 1 - u.
+        expected = truncnorm.ppf(1 - u if mirrored else u, a, b, loc=mean, scale=sd)
+        draws = sample_truncated_normal(1000, mean, sd, low, upp, random_state=7)
+        np.testing.assert_allclose(draws, expected, rtol=1e-12)
+
+
+def test_draws_stay_within_bounds():
+    for mean, sd, low, upp, _ in CASES:
+        draws = sample_truncated_normal(100000, mean, sd, low, upp, random_state=0)
+        assert draws.min() >= low and draws.max() <= upp
+
+
+def test_same_seed_gives_same_draws():
+    first = sample_truncated_normal(1000, 50.0, 15.0, 0.0, 100.0, random_state=3)
+    second = sample_truncated_normal(1000, 50.0, 15.0, 0.0, 100.0, random_state=np.random.default_rng(3))
+    np.testing.assert_array_equal(first, second)
+
+
+def test_dtype_is_respected():
+    draws = sample_truncated_normal(10, 50.0, 15.0, 0.0, 100.0, random_state=0, dtype=np.float32)
+    assert draws.dtype == np.float32
+    assert sample_truncated_normal(10, random_state=0).dtype == np.float64
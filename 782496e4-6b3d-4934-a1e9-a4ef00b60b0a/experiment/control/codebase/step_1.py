@@ -2,6 +2,77 @@ import os
 import numpy as np
 import pandas as pd
 
+# 学生数据表的类别定义：分类编码即列表下标。
+DIAGNOSIS_CATEGORIES = ["知识短板型", "动机短板型", "混合短板型"]
+GROUP_CATEGORIES = ['Control', 'General', 'Skill', 'Motivation', 'Matched']
+
+# 各步骤学生数据表的列类型约定，读写中间文件时保持一致，避免出现 object 列。
+STUDENT_TABLE_DTYPES = {
+    'student_id': np.int32,
+    'Diagnosis': pd.CategoricalDtype(DIAGNOSIS_CATEGORIES),
+    'Group': pd.CategoricalDtype(GROUP_CATEGORIES),
+}
+
+# 可选择以 float32 存储的连续变量列。
+STUDENT_FLOAT_COLUMNS = [
+    'K', 'M', 'K_norm', 'M_norm', 'A_pre',
+    'K_post', 'M_post', 'K_post_norm', 'M_post_norm', 'A_post', 'Gain_Score'
+]
+
+def student_table_dtypes(float_dtype=np.float64):
+    """
+    返回学生数据表各列的目标类型。
+
+    Args:
+        float_dtype (type): 连续变量列的类型，np.float32 可使这些列的内存减半。
+
+    Returns:
+        dict: 列名到类型的映射，可直接传给 pd.read_csv 或 DataFrame.astype。
+    """
+    dtypes = dict(STUDENT_TABLE_DTYPES)
+    dtypes.update({column: float_dtype for column in STUDENT_FLOAT_COLUMNS})
+    return dtypes
+
+def apply_student_schema(df, float_dtype=np.float64):
+    """
+    将学生数据表中已存在的列转换为约定的类型。
+
+    Args:
+        df (pd.DataFrame): 学生数据表。
+        float_dtype (type): 连续变量列的类型。
+
+    Returns:
+        pd.DataFrame: 转换类型后的新数据表。
+    """
+    dtypes = student_table_dtypes(float_dtype)
+    return df.astype({column: dtypes[column] for column in df.columns if column in dtypes})
+
+def read_student_table(file_path, float_dtype=np.float64, **kwargs):
+    """
+    按约定的类型从 CSV 文件读取学生数据表，解析时直接生成分类列和定宽整数列。
+
+    Args:
+        file_path (str): 输入的CSV文件路径。
+        float_dtype (type): 连续变量列的类型。
+        **kwargs: 传给 pd.read_csv 的其他参数，例如 usecols 或 chunksize。
+
+    Returns:
+        pd.DataFrame: 学生数据表（指定 chunksize 时为分块读取器）。
+    """
+    return pd.read_csv(file_path, dtype=student_table_dtypes(float_dtype), **kwargs)
+
+def write_student_table(df, file_path, **kwargs):
+    """
+    将学生数据表写入 CSV 文件。分类列以标签写出，缺失值写为空，
+    因此 read_student_table 可以无损地恢复类型。
+
+    Args:
+        df (pd.DataFrame): 学生数据表。
+        file_path (str): 输出的CSV文件路径。
+        **kwargs: 传给 DataFrame.to_csv 的其他参数，例如 mode 和 header。
+    """
+    df.to_csv(file_path, index=False, **kwargs)
+
 def min_max_scaler(data):
     """
     对一维 numpy 数组进行最小-最大标准化。
@@ -19,7 +90,7 @@ def min_max_scaler(data):
         return np.zeros_like(data)
     return (data - min_val) / (max_val - min_val)
 
-def generate_initial_data(n_samples, mean, cov, alpha, beta):
+def generate_initial_data(n_samples, mean, cov, alpha, beta, seed=None):
     """
     生成模拟实验所需的初始学生数据集。
 
@@ -32,11 +103,13 @@ def generate_initial_data(n_samples, mean, cov, alpha, beta):
         cov (list or np.ndarray): 多维正态分布的协方差矩阵。
         alpha (float): 知识（K）在计算学业成就时的权重。
         beta (float): 动机（M）在计算学业成就时的权重。
+        seed (int or np.random.SeedSequence, optional): 随机种子，用于构造独立的 Generator 随机流。
 
     Returns:
         pd.DataFrame: 包含学生ID、K、M、K_norm、M_norm 和 A_pre 的 DataFrame。
     """
-    initial_attributes = np.random.multivariate_normal(mean, cov, n_samples)
+    rng = np.random.default_rng(seed)
+    initial_attributes = rng.multivariate_normal(mean, cov, n_samples)
     k_initial = initial_attributes[:, 0]
     m_initial = initial_attributes[:, 1]
 
@@ -45,7 +118,7 @@ def generate_initial_data(n_samples, mean, cov, alpha, beta):
 
     a_pre = alpha * k_norm + beta * m_norm
 
-    student_ids = np.arange(n_samples)
+    student_ids = np.arange(n_samples, dtype=np.int32)
     data = {
         'student_id': student_ids,
         'K': k_initial,
@@ -57,12 +130,93 @@ def generate_initial_data(n_samples, mean, cov, alpha, beta):
     df = pd.DataFrame(data)
     return df
 
+def _iter_attribute_chunks(n_samples, mean, cov, seed, chunksize):
+    """
+    按块生成 (学生ID, K, M)，每块使用由 seed 派生的独立随机流。
+
+    由于随机流只取决于块编号，重复调用会得到完全相同的数据，
+    因此两遍扫描时无需在内存或磁盘上保存原始抽样。
+    """
+    n_chunks = -(-n_samples // chunksize)
+    child_seeds = np.random.SeedSequence(seed).spawn(n_chunks)
+    for index, child_seed in enumerate(child_seeds):
+        start = index * chunksize
+        size = min(chunksize, n_samples - start)
+        attributes = np.random.default_rng(child_seed).multivariate_normal(mean, cov, size)
+        yield np.arange(start, start + size, dtype=np.int32), attributes[:, 0], attributes[:, 1]
+
+def generate_initial_data_chunked(output_path, n_samples, mean, cov, alpha, beta, seed=None, chunksize=1000000):
+    """
+    以分块方式生成初始学生数据并直接写入 CSV 文件，内存占用只与块大小有关。
+
+    第一遍扫描只统计 K 和 M 的全局最小/最大值；第二遍重新生成相同的数据块，
+    完成最小-最大标准化并计算 A_pre 后逐块追加写入文件，列与 generate_initial_data 相同。
+    由于每块使用独立的随机流，结果由 seed 和 chunksize 共同决定。
+
+    Args:
+        output_path (str): 输出的CSV文件路径。
+        n_samples (int): 模拟的学生数量。
+        mean (list or np.ndarray): 多维正态分布的均值向量。
+        cov (list or np.ndarray): 多维正态分布的协方差矩阵。
+        alpha (float): 知识（K）在计算学业成就时的权重。
+        beta (float): 动机（M）在计算学业成就时的权重。
+        seed (int or np.random.SeedSequence, optional): 派生各块随机流的根种子。
+        chunksize (int): 每块的学生数量。
+
+    Returns:
+        dict: 与 compute_global_stats 格式相同的 K 和 M 全局 (最小值, 最大值)。
+    """
+    if seed is None:
+        # 两遍扫描必须得到相同的数据，因此固定一个随机熵
+        seed = np.random.SeedSequence().entropy
+
+    # 第一遍：全局最小/最大值
+    k_min = m_min = np.inf
+    k_max = m_max = -np.inf
+    for _, k_chunk, m_chunk in _iter_attribute_chunks(n_samples, mean, cov, seed, chunksize):
+        k_min, k_max = min(k_min, k_chunk.min()), max(k_max, k_chunk.max())
+        m_min, m_max = min(m_min, m_chunk.min()), max(m_max, m_chunk.max())
+    k_range = k_max - k_min
+    m_range = m_max - m_min
+
+    # 第二遍：标准化并逐块写入
+    header = True
+    for student_ids, k_chunk, m_chunk in _iter_attribute_chunks(n_samples, mean, cov, seed, chunksize):
+        k_norm = (k_chunk - k_min) / k_range if k_range else np.zeros_like(k_chunk)
+        m_norm = (m_chunk - m_min) / m_range if m_range else np.zeros_like(m_chunk)
+        chunk_df = pd.DataFrame({
+            'student_id': student_ids,
+            'K': k_chunk,
+            'M': m_chunk,
+            'K_norm': k_norm,
+            'M_norm': m_norm,
+            'A_pre': alpha * k_norm + beta * m_norm
+        })
+        write_student_table(chunk_df, output_path, mode='w' if header else 'a', header=header)
+        header = False
+
+    return {'K': (k_min, k_max), 'M': (m_min, m_max)}
+
+def compute_global_stats(df, columns=('K', 'M')):
+    """
+    计算指定列的全局最小值和最大值，供后续步骤的标准化复用。
+
+    Args:
+        df (pd.DataFrame): 初始学生数据。
+        columns (tuple): 需要统计的列名。
+
+    Returns:
+        dict: 列名到 (最小值, 最大值) 元组的映射。
+    """
+    return {column: (df[column].min(), df[column].max()) for column in columns}
+
 if __name__ == '__main__':
     N = 10000
     MU = [0, 0]
     SIGMA = [[1, 0.2], [0.2, 1]]
     ALPHA = 0.6
     BETA = 0.4
+    SEED = 42
 
     DATA_DIR = "/work_dir/data"
     CODE_DIR = "/work_dir/codebase"
@@ -77,7 +231,8 @@ if __name__ == '__main__':
         mean=MU,
         cov=SIGMA,
         alpha=ALPHA,
-        beta=BETA
+        beta=BETA,
+        seed=SEED
     )
 
     pd.set_option('display.max_columns', None)
@@ -88,6 +243,6 @@ if __name__ == '__main__':
     print("\nData Description:")
     print(student_data_df.describe())
 
-    student_data_df.to_csv(OUTPUT_FILE, index=False)
+    write_student_table(student_data_df, OUTPUT_FILE)
 
     print("\n" + "Initial student data successfully generated and saved to: " + OUTPUT_FILE)
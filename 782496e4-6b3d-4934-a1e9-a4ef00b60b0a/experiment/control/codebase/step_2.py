@@ -2,6 +2,8 @@ import os
 import pandas as pd
 import numpy as np
 
+from step_1 import DIAGNOSIS_CATEGORIES, read_student_table, write_student_table
+
 def create_directories_if_not_exist(path):
     """确保给定文件路径的目录存在。
 
@@ -22,7 +24,7 @@ def load_data(file_path):
         pd.DataFrame: 加载后的数据框。
     """
     print("Loading data from: " + file_path)
-    return pd.read_csv(file_path)
+    return read_student_table(file_path)
 
 def filter_low_achievers(df, column_name, percentile_threshold):
     """根据指定列的百分位数筛选数据框。
@@ -40,6 +42,190 @@ def filter_low_achievers(df, column_name, percentile_threshold):
     low_achievers_df = df[df[column_name] <= threshold_value].copy()
     return low_achievers_df, threshold_value
 
+class KLLSketch:
+    """KLL 流式分位数草图 (Karnin, Lang & Liberty, 2016)。
+
+    第 h 层缓冲区中每个元素代表 2**h 个原始样本。某层超出容量时将其排序，
+    以随机偏移每隔一个元素提升到上一层，因此内存只随 k * log(n / k) 增长，
+    适用于分块读取或内存映射的超大列。
+
+    Args:
+        k (int): 顶层缓冲区容量，越大精度越高。
+        seed (int, optional): 压缩时随机偏移所用的随机种子。
+    """
+
+    def __init__(self, k=200, seed=None):
+        self.k = k
+        self.count = 0
+        self._levels = [np.empty(0)]
+        # 每次压缩对任意秩带来至多 2**h 的零均值误差，这里累计其平方和。
+        self._error_scale = 0.0
+        self._rng = np.random.default_rng(seed)
+
+    def _capacity(self, level):
+        depth = len(self._levels) - 1 - level
+        return max(2, int(np.ceil(self.k * (2.0 / 3.0) ** depth)))
+
+    def update(self, values):
+        """将一块数据并入草图，缺失值被忽略（与 pandas 的 quantile 一致）。
+
+        Args:
+            values (array-like): 一块一维数值数据。
+        """
+        values = np.asarray(values, dtype=float).ravel()
+        values = values[~np.isnan(values)]
+        self.count += values.size
+        self._levels[0] = np.concatenate([self._levels[0], values])
+
+        level = 0
+        while level < len(self._levels):
+            buffer = self._levels[level]
+            if buffer.size > self._capacity(level):
+                if level + 1 == len(self._levels):
+                    self._levels.append(np.empty(0))
+                buffer = np.sort(buffer)
+                n_paired = buffer.size - buffer.size % 2
+                offset = self._rng.integers(2)
+                self._levels[level + 1] = np.concatenate([self._levels[level + 1], buffer[offset:n_paired:2]])
+                # 元素个数为奇数时，最大的元素留在本层，保证总权重不变
+                self._levels[level] = buffer[n_paired:]
+                self._error_scale += float(2 ** level) ** 2
+            level += 1
+
+    def rank_error(self, delta=0.01):
+        """返回秩误差的概率上界。
+
+        由 Hoeffding 不等式，任一查询的秩误差以至少 1 - delta 的概率不超过该值。
+
+        Args:
+            delta (float): 允许的失败概率。
+
+        Returns:
+            int: 以样本个数计的秩误差上界。
+        """
+        return int(np.ceil(np.sqrt(2.0 * self._error_scale * np.log(2.0 / delta))))
+
+    def value_at_rank(self, rank):
+        """返回近似的第 rank 个（从 0 开始）顺序统计量。
+
+        Args:
+            rank (float): 目标秩；小于 0 时返回 -inf，超出样本数时返回 inf。
+
+        Returns:
+            float: 近似的顺序统计量。
+        """
+        if rank < 0:
+            return -np.inf
+        if rank >= self.count:
+            return np.inf
+        values = np.concatenate(self._levels)
+        weights = np.concatenate([np.full(buffer.size, 2 ** level) for level, buffer in enumerate(self._levels)])
+        order = np.argsort(values, kind='stable')
+        cumulative = np.cumsum(weights[order])
+        return values[order[min(np.searchsorted(cumulative, rank, side='right'), values.size - 1)]]
+
+    def quantile(self, q):
+        """返回近似的 q 分位数，秩的定义与 pandas 的线性插值一致。"""
+        return self.value_at_rank(q * (self.count - 1))
+
+def iter_csv_column(file_path, column_name, chunksize=1000000):
+    """分块读取 CSV 文件中的一列。
+
+    Args:
+        file_path (str): 输入的CSV文件路径。
+        column_name (str): 需要读取的列名。
+        chunksize (int): 每块的行数。
+
+    Yields:
+        np.ndarray: 每块的列值。
+    """
+    for chunk in pd.read_csv(file_path, usecols=[column_name], chunksize=chunksize):
+        yield chunk[column_name].to_numpy()
+
+def iter_array_chunks(values, chunksize=1000000):
+    """将（可能是内存映射的）一维数组按块切分，不复制整列。
+
+    Args:
+        values (np.ndarray): 一维数组，例如 np.load(..., mmap_mode='r') 的结果。
+        chunksize (int): 每块的元素个数。
+
+    Yields:
+        np.ndarray: 数组的连续切片。
+    """
+    for start in range(0, len(values), chunksize):
+        yield values[start:start + chunksize]
+
+def streaming_quantile(make_chunks, q, k=200, exact=False, delta=0.01, seed=0):
+    """以流式方式计算一列数据的 q 分位数。
+
+    第一遍扫描构建 KLLSketch。若 exact 为 True，则第二遍扫描只保留草图误差界
+    覆盖的候选区间内的值，据此得到精确的线性插值分位数（与 pandas 的 quantile
+    定义相同，仅秩的浮点舍入可能相差一个最小单位）；
+    若候选区间未能覆盖目标秩（概率不超过 delta），则扩大区间后重新扫描。
+
+    Args:
+        make_chunks (callable): 无参函数，每次调用返回一个新的数据块迭代器。
+        q (float): 分位数 (0到1之间)。
+        k (int): 草图精度参数。
+        exact (bool): 是否进行精确的第二遍扫描。
+        delta (float): 候选区间的失败概率。
+        seed (int): 草图压缩所用的随机种子。
+
+    Returns:
+        float: q 分位数的近似值或精确值。
+    """
+    sketch = KLLSketch(k, seed)
+    for chunk in make_chunks():
+        sketch.update(chunk)
+    if sketch.count == 0:
+        return np.nan
+    if not exact:
+        return sketch.quantile(q)
+
+    # 线性插值法：q 分位数位于升序排列后（从 0 开始）的第 q * (n - 1) 个位置，
+    # 取其两侧相邻的两个顺序统计量按小数部分插值
+    position = q * (sketch.count - 1)
+    lower_rank = int(np.floor(position))
+    upper_rank = int(np.ceil(position))
+    margin = sketch.rank_error(delta) + 1
+    while True:
+        low = sketch.value_at_rank(lower_rank - margin)
+        high = sketch.value_at_rank(upper_rank + margin)
+        n_below = 0
+        candidates = []
+        for chunk in make_chunks():
+            chunk = np.asarray(chunk, dtype=float)
+            n_below += np.count_nonzero(chunk < low)
+            candidates.append(chunk[(chunk >= low) & (chunk <= high)])
+        candidates = np.sort(np.concatenate(candidates))
+        if n_below <= lower_rank and upper_rank < n_below + candidates.size:
+            break
+        margin *= 4
+    pair = candidates[[lower_rank - n_below, upper_rank - n_below]]
+    return np.quantile(pair, position - lower_rank)
+
+def filter_low_achievers_chunked(file_path, column_name, percentile_threshold, chunksize=1000000, exact=True):
+    """以分块方式从 CSV 文件中筛选低成就学生，内存只与分块大小和筛选结果有关。
+
+    Args:
+        file_path (str): 输入的CSV文件路径。
+        column_name (str): 用于筛选的列名。
+        percentile_threshold (float): 用于定义筛选边界的百分位数 (0到1之间)。
+        chunksize (int): 每块读取的行数。
+        exact (bool): 是否通过第二遍扫描得到精确阈值，筛选出的学生与 filter_low_achievers 相同。
+
+    Returns:
+        tuple[pd.DataFrame, float]: 一个包含筛选后数据框和阈值的元组，行索引与整表读取时一致。
+    """
+    threshold_value = streaming_quantile(
+        lambda: iter_csv_column(file_path, column_name, chunksize), percentile_threshold, exact=exact
+    )
+    print("Calculated " + str(percentile_threshold * 100) + "th percentile for '" + column_name + "' is: " + str(threshold_value))
+    low_achievers_df = pd.concat(
+        [chunk[chunk[column_name] <= threshold_value] for chunk in read_student_table(file_path, chunksize=chunksize)]
+    )
+    return low_achievers_df, threshold_value
+
 def calculate_and_print_stats(df, columns):
     """计算并打印指定列的均值和标准差。
 
@@ -83,6 +269,74 @@ def diagnose_student(row, k_mean, m_mean):
     else:
         return "混合短板型"
 
+# 两特质（K、M）诊断的类别表 DIAGNOSIS_CATEGORIES 定义在 step_1 的数据表类型约定中。
+# 以特质掩码（第0位: K 低于均值，第1位: M 低于均值）为下标的类别编码查找表，
+# 与 diagnose_student 的判定规则一致：两者都不低于或都低于均值时归为混合短板型。
+DIAGNOSIS_LOOKUP = np.array([2, 0, 1, 2], dtype=np.int8)
+
+def compute_trait_masks(df, trait_columns, trait_means):
+    """以数组运算计算每个学生的特质短板位掩码。
+
+    第 i 位为 1 表示该学生的第 i 个特质低于对应均值，因此可以支持任意数量的潜在特质。
+
+    Args:
+        df (pd.DataFrame): 学生数据框。
+        trait_columns (list): 特质列名列表。
+        trait_means (list): 与特质列一一对应的均值。
+
+    Returns:
+        np.ndarray: 每个学生的位掩码，按特质数量选择最小的无符号整数类型。
+    """
+    values = df[trait_columns].to_numpy()
+    return trait_masks_from_values(values, np.asarray(trait_means, dtype=values.dtype))
+
+def trait_masks_from_values(values, trait_means):
+    """compute_trait_masks 的数组版本，最后一维为特质，其余维度可任意（例如批量重复实验）。
+
+    Args:
+        values (np.ndarray): 形状为 (..., 特质数) 的特质取值。
+        trait_means (np.ndarray): 可广播到 values 的均值，例如 (特质数,) 或 (重复次数, 1, 特质数)。
+
+    Returns:
+        np.ndarray: 形状为 values.shape[:-1] 的位掩码。
+    """
+    below_mean = values < trait_means
+    n_traits = values.shape[-1]
+    dtype = np.min_scalar_type((1 << n_traits) - 1)
+    masks = np.zeros(values.shape[:-1], dtype=dtype)
+    for bit in range(n_traits):
+        masks |= below_mean[..., bit].astype(dtype) << bit
+    return masks
+
+def build_trait_mask_labels(trait_names):
+    """生成位掩码对应的标签表，标签表下标即位掩码取值。
+
+    Args:
+        trait_names (list): 特质名称列表，顺序与位序一致。
+
+    Returns:
+        list: 长度为 2 ** len(trait_names) 的标签列表。
+    """
+    labels = []
+    for mask in range(1 << len(trait_names)):
+        deficits = [name for bit, name in enumerate(trait_names) if mask >> bit & 1]
+        labels.append("+".join(deficits) + "短板" if deficits else "无短板")
+    return labels
+
+def diagnose_students(df, k_mean, m_mean):
+    """向量化地对学生进行诊断分类，结果与逐行调用 diagnose_student 一致。
+
+    Args:
+        df (pd.DataFrame): 需要诊断的学生数据框。
+        k_mean (float): 低成就学生群体的K_norm均值。
+        m_mean (float): 低成就学生群体的M_norm均值。
+
+    Returns:
+        np.ndarray: int8 类别编码，对应 DIAGNOSIS_CATEGORIES 的下标。
+    """
+    masks = compute_trait_masks(df, ['K_norm', 'M_norm'], [k_mean, m_mean])
+    return DIAGNOSIS_LOOKUP[masks]
+
 def save_data(df, file_path):
     """将DataFrame保存到CSV文件，不包含索引。
 
@@ -91,31 +345,45 @@ def save_data(df, file_path):
         file_path (str): 输出的CSV文件路径。
     """
     create_directories_if_not_exist(file_path)
-    df.to_csv(file_path, index=False)
+    write_student_table(df, file_path)
     print("Successfully saved updated data to: " + file_path)
 
-def main():
-    """主执行函数，完成学生诊断分类任务。"""
-    input_path = '/work_dir/data/initial_student_data.csv'
-    output_path = '/work_dir/data/diagnosed_student_data.csv'
+def diagnose_population(student_df, percentile_threshold=0.2):
+    """筛选低成就学生并在原数据框上写入 'Diagnosis' 分类列。
 
-    # 1. 读取数据
-    student_df = load_data(input_path)
+    Args:
+        student_df (pd.DataFrame): 全体学生数据框，会被原地添加 'Diagnosis' 列。
+        percentile_threshold (float): 低成就学生的 A_pre 百分位阈值 (0到1之间)。
 
-    # 2. 筛选低成就学生
-    low_achievers_df, _ = filter_low_achievers(student_df, 'A_pre', 0.2)
+    Returns:
+        pd.DataFrame: 添加了 'Diagnosis' 列的学生数据框（未诊断学生为缺失值）。
+    """
+    # 1. 筛选低成就学生
+    low_achievers_df, _ = filter_low_achievers(student_df, 'A_pre', percentile_threshold)
 
-    # 3. 计算并打印低成就学生群体的统计数据
+    # 2. 计算并打印低成就学生群体的统计数据
     stats = calculate_and_print_stats(low_achievers_df, ['K_norm', 'M_norm'])
     k_norm_mean = stats['K_norm']['mean']
     m_norm_mean = stats['M_norm']['mean']
 
-    # 4. & 5. 对低成就学生进行诊断并更新DataFrame
-    student_df['Diagnosis'] = np.nan
-    diagnosis_results = low_achievers_df.apply(
-        lambda row: diagnose_student(row, k_norm_mean, m_norm_mean), axis=1
+    # 3. 对低成就学生进行诊断并更新DataFrame（编码 -1 表示未诊断）
+    diagnosis_codes = np.full(len(student_df), -1, dtype=np.int8)
+    diagnosis_codes[student_df.index.get_indexer(low_achievers_df.index)] = diagnose_students(
+        low_achievers_df, k_norm_mean, m_norm_mean
     )
-    student_df.loc[low_achievers_df.index, 'Diagnosis'] = diagnosis_results
+    student_df['Diagnosis'] = pd.Categorical.from_codes(diagnosis_codes, categories=DIAGNOSIS_CATEGORIES)
+    return student_df
+
+def main():
+    """主执行函数，完成学生诊断分类任务。"""
+    input_path = '/work_dir/data/initial_student_data.csv'
+    output_path = '/work_dir/data/diagnosed_student_data.csv'
+
+    # 1. 读取数据
+    student_df = load_data(input_path)
+
+    # 2. - 5. 筛选低成就学生、计算统计数据并进行诊断
+    diagnose_population(student_df, 0.2)
 
     # 6. 保存更新后的DataFrame
     save_data(student_df, output_path)
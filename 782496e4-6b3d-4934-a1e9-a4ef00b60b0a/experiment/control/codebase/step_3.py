@@ -1,8 +1,35 @@
 import os
-import pandas as pd
-import matplotlib
-import matplotlib.pyplot as plt
-import seaborn as sns
+from functools import lru_cache
+
+from step_1 import read_student_table
+
+# 按优先级排列的候选中文字体。
+CJK_FONT_CANDIDATES = ['SimHei', 'Noto Sans CJK SC', 'WenQuanYi Zen Hei', 'Microsoft YaHei']
+
+@lru_cache(maxsize=None)
+def configure_plotting():
+    """导入 matplotlib（Agg 后端）和 seaborn，并配置中文字体，每个进程只执行一次。
+
+    中文字体从 matplotlib 已加载的字体列表中直接查找，而不是逐个字形回退查找，
+    因此不会触发字体缓存的重建。
+
+    Returns:
+        tuple: matplotlib.pyplot 和 seaborn 模块。
+    """
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+    from matplotlib import font_manager
+
+    installed_fonts = {font.name for font in font_manager.fontManager.ttflist}
+    cjk_fonts = [name for name in CJK_FONT_CANDIDATES if name in installed_fonts]
+    if cjk_fonts:
+        matplotlib.rcParams['font.sans-serif'] = cjk_fonts + matplotlib.rcParams['font.sans-serif']
+    else:
+        print("警告：未找到 'SimHei' 等中文字体，中文标签可能无法正常显示。请安装该字体或更换为其他支持中文的字体。")
+    matplotlib.rcParams['axes.unicode_minus'] = False
+    return plt, sns
 
 def generate_heterogeneity_plot(csv_path, plot_path):
     """加载学生数据，生成并保存在知识与动机潜在空间中的异质性分布散点图。
@@ -18,13 +45,9 @@ def generate_heterogeneity_plot(csv_path, plot_path):
     Returns:
         None
     """
-    try:
-        matplotlib.rcParams['font.sans-serif'] = ['SimHei']
-        matplotlib.rcParams['axes.unicode_minus'] = False
-    except Exception:
-        print("警告：未找到 'SimHei' 字体，中文标签可能无法正常显示。请安装该字体或更换为其他支持中文的字体。")
+    plt, sns = configure_plotting()
 
-    df = pd.read_csv(csv_path)
+    df = read_student_table(csv_path)
 
     diagnosed_df = df[df['Diagnosis'].notna()].copy()
 
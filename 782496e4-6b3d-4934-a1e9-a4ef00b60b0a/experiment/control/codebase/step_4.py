@@ -1,114 +1,369 @@
 import pandas as pd
 import numpy as np
 import os
+from concurrent.futures import ProcessPoolExecutor
 
-def run_intervention_simulation():
-    """执行教育干预模拟，计算干预后分数并保存结果。
+from step_1 import GROUP_CATEGORIES as GROUPS
+from step_1 import DIAGNOSIS_CATEGORIES
+from step_1 import generate_initial_data, compute_global_stats, read_student_table, write_student_table
+from step_2 import DIAGNOSIS_LOOKUP, diagnose_population, trait_masks_from_values
 
-    该函数执行以下步骤：
-    1.  加载诊断数据和原始数据。
-    2.  获取 K 和 M 的全局最小/最大值用于标准化。
-    3.  定义干预模型参数。
-    4.  将低成就学生随机分配到五个实验组。
-    5.  根据学生所在组和诊断类型，应用干预模型计算 K_post 和 M_post。
-    6.  对干预后分数进行标准化。
-    7.  计算干预后学业成就 A_post 和成就增益 Gain_Score。
-    8.  将结果保存到 CSV 文件。
+# 规则表使用的诊断类型，按位置对应 step_2 的诊断类别（知识短板型、动机短板型、混合短板型），
+# 因此 'Diagnosis' 列的分类编码即为规则表的诊断编码。注意这不是一一对应的语义：step_2 把
+# K、M 都不低于均值的学生也归为混合短板型，这些学生同样按 'Both-deficit' 规则获得完整的
+# K + M + gamma 干预（N=10000 时约占低成就学生的 18%），Matched 组的结果包含这部分学生。
+DIAGNOSES = ['K-deficit', 'M-deficit', 'Both-deficit']
+
+# 干预参数
+DELTA_K = 0.2
+GAMMA = 1.0
+DELTA_M = 0.2
+DELTA_K_GEN = 0.05
+DELTA_M_GEN = 0.05
+
+# 干预规则表：(Group, Diagnosis, dK, dM, gamma)，Diagnosis 为 None 表示该组所有学生。
+# 规则的效果为 K_post = K + dK + gamma * M，M_post = M + dM；同一学生命中多条规则时效果相加。
+INTERVENTION_RULES = [
+    ('General', None, DELTA_K_GEN, DELTA_M_GEN, 0.0),
+    ('Skill', None, DELTA_K, 0.0, GAMMA),
+    ('Motivation', None, 0.0, DELTA_M, 0.0),
+    ('Matched', 'K-deficit', DELTA_K, 0.0, GAMMA),
+    ('Matched', 'M-deficit', 0.0, DELTA_M, 0.0),
+    ('Matched', 'Both-deficit', DELTA_K, DELTA_M, GAMMA),
+]
+
+def compile_intervention_rules(rules, groups=GROUPS, diagnoses=DIAGNOSES):
+    """将干预规则表编译为按 (组编码, 诊断编码) 索引的查找表。
+
+    查找表的形状为 (len(groups) + 1, len(diagnoses) + 1)，最后一行/列对应
+    未分组或未诊断的学生（缺失值的分类编码 -1 恰好索引到最后一行/列）。
+
+    Args:
+        rules (list): (Group, Diagnosis, dK, dM, gamma) 元组的列表。
+        groups (list): 组名列表，下标即组编码。
+        diagnoses (list): 诊断类型列表，下标即诊断编码。
+
+    Returns:
+        tuple[np.ndarray, np.ndarray, np.ndarray]: dK、dM 和 gamma 查找表。
     """
-    # 定义文件路径
-    diagnosed_data_path = '/work_dir/data/diagnosed_student_data.csv'
-    initial_data_path = '/work_dir/data/initial_student_data.csv'
-    output_path = '/work_dir/data/intervention_results.csv'
+    shape = (len(groups) + 1, len(diagnoses) + 1)
+    delta_k_table = np.zeros(shape)
+    delta_m_table = np.zeros(shape)
+    gamma_table = np.zeros(shape)
+    for group, diagnosis, delta_k, delta_m, gamma in rules:
+        if group not in groups:
+            raise ValueError("Unknown group in intervention rule: " + str(group))
+        if diagnosis is not None and diagnosis not in diagnoses:
+            raise ValueError("Unknown diagnosis in intervention rule: " + str(diagnosis))
+        row = groups.index(group)
+        column = slice(None) if diagnosis is None else diagnoses.index(diagnosis)
+        delta_k_table[row, column] += delta_k
+        delta_m_table[row, column] += delta_m
+        gamma_table[row, column] += gamma
+    return delta_k_table, delta_m_table, gamma_table
 
-    # 确保输出目录存在
-    output_dir = os.path.dirname(output_path)
-    if not os.path.exists(output_dir):
-        os.makedirs(output_dir)
+def assign_intervention_groups(diagnosed_df, seed=42):
+    """将低成就学生随机且均等地分配到五个实验组，结果写入 'Group' 列。
 
-    # 1. 加载数据
-    diagnosed_df = pd.read_csv(diagnosed_data_path)
-    initial_df = pd.read_csv(initial_data_path)
+    Args:
+        diagnosed_df (pd.DataFrame): 含 'Diagnosis' 列的学生数据，会被原地修改。
+        seed (int or np.random.SeedSequence): 随机种子，保证分组可复现。
 
-    # 2. 从 initial_student_data.csv 获取全局 K 和 M 的最小-最大值
-    k_min = initial_df['K'].min()
-    k_max = initial_df['K'].max()
-    m_min = initial_df['M'].min()
-    m_max = initial_df['M'].max()
-
-    # 3. 定义干预参数
-    delta_k = 0.2
-    gamma = 1.0
-    delta_m = 0.2
-    delta_k_gen = 0.05
-    delta_m_gen = 0.05
-
-    # 4. 筛选出低成就学生
+    Returns:
+        pd.DataFrame: 添加了 'Group' 列的学生数据（非低成就学生为缺失值）。
+    """
+    # 筛选出低成就学生
     low_achievers_mask = diagnosed_df['Diagnosis'].notna()
     low_achiever_indices = diagnosed_df[low_achievers_mask].index.to_numpy()
 
-    # 5. 将低成就学生随机且均等地分配到五个实验组
-    np.random.seed(42)  # for reproducibility
-    np.random.shuffle(low_achiever_indices)
-    groups = ['Control', 'General', 'Skill', 'Motivation', 'Matched']
-    group_assignments = np.array_split(low_achiever_indices, len(groups))
-
-    diagnosed_df['Group'] = pd.NA
-    for i, group_name in enumerate(groups):
-        diagnosed_df.loc[group_assignments[i], 'Group'] = group_name
-
-    # 6. 初始化 K_post 和 M_post 列
-    diagnosed_df['K_post'] = diagnosed_df['K']
-    diagnosed_df['M_post'] = diagnosed_df['M']
+    rng = np.random.default_rng(seed)  # for reproducibility
+    low_achiever_indices = rng.permutation(low_achiever_indices)
+    group_assignments = np.array_split(low_achiever_indices, len(GROUPS))
 
-    # 7. 遍历每个低成就学生，根据其所在的 'Group' 和 'Diagnosis' 应用干预模型
-    # 使用向量化操作提高效率
+    group_codes = np.full(len(diagnosed_df), -1, dtype=np.int8)
+    for i, group_indices in enumerate(group_assignments):
+        group_codes[diagnosed_df.index.get_indexer(group_indices)] = i
+    diagnosed_df['Group'] = pd.Categorical.from_codes(group_codes, categories=GROUPS)
+    return diagnosed_df
 
-    # General Intervention Group
-    general_mask = diagnosed_df['Group'] == 'General'
-    diagnosed_df.loc[general_mask, 'K_post'] += delta_k_gen
-    diagnosed_df.loc[general_mask, 'M_post'] += delta_m_gen
+def _category_codes(values, categories, column_name):
+    """返回按 categories 编码的分类编码，缺失值为 -1。
 
-    # Skill-only Intervention Group
-    skill_mask = diagnosed_df['Group'] == 'Skill'
-    diagnosed_df.loc[skill_mask, 'K_post'] += delta_k + gamma * diagnosed_df.loc[skill_mask, 'M']
+    Raises:
+        ValueError: 存在不在 categories 中的非缺失取值时抛出，避免其静默落入 -1 的空规则。
+    """
+    codes = pd.Categorical(values, categories=categories).codes
+    unknown = (codes == -1) & np.asarray(pd.notna(values))
+    if unknown.any():
+        unknown_labels = pd.unique(np.asarray(values)[unknown])
+        raise ValueError("Unknown " + column_name + " values: " + ", ".join(map(str, unknown_labels)))
+    return codes
 
-    # Motivation-only Intervention Group
-    motivation_mask = diagnosed_df['Group'] == 'Motivation'
-    diagnosed_df.loc[motivation_mask, 'M_post'] += delta_m
+def apply_intervention_model(diagnosed_df, global_stats, rules=INTERVENTION_RULES):
+    """根据学生所在组和诊断类型应用干预模型，计算干预后分数与成就增益。
 
-    # Matched Intervention Group
-    matched_group_mask = diagnosed_df['Group'] == 'Matched'
-    k_deficit_mask = matched_group_mask & (diagnosed_df['Diagnosis'] == 'K-deficit')
-    m_deficit_mask = matched_group_mask & (diagnosed_df['Diagnosis'] == 'M-deficit')
-    both_deficit_mask = matched_group_mask & (diagnosed_df['Diagnosis'] == 'Both-deficit')
+    诊断类别按位置映射到规则表的诊断类型（见 DIAGNOSES）；被 step_2 归为混合短板型但并无短板的
+    学生在 Matched 组中也按 'Both-deficit' 规则干预。
 
-    # K-deficit in Matched group
-    diagnosed_df.loc[k_deficit_mask, 'K_post'] += delta_k + gamma * diagnosed_df.loc[k_deficit_mask, 'M']
+    Args:
+        diagnosed_df (pd.DataFrame): 含 'Diagnosis' 和 'Group' 列的学生数据，会被原地修改。
+        global_stats (dict): compute_global_stats 的结果，提供 K 和 M 的全局最小/最大值。
+        rules (list): 干预规则表，格式见 INTERVENTION_RULES。
 
-    # M-deficit in Matched group
-    diagnosed_df.loc[m_deficit_mask, 'M_post'] += delta_m
+    Returns:
+        pd.DataFrame: 添加了 K_post、M_post、标准化分数、A_post 和 Gain_Score 的学生数据。
+    """
+    k_min, k_max = global_stats['K']
+    m_min, m_max = global_stats['M']
 
-    # Both-deficit in Matched group
-    diagnosed_df.loc[both_deficit_mask, 'K_post'] += delta_k + gamma * diagnosed_df.loc[both_deficit_mask, 'M']
-    diagnosed_df.loc[both_deficit_mask, 'M_post'] += delta_m
+    # 按组和诊断的分类编码从查找表中取出每个学生的参数，一次完成全部规则；
+    # step_2 的诊断类别按 DIAGNOSIS_CATEGORIES 编码，编码与 DIAGNOSES 的下标一致
+    delta_k_table, delta_m_table, gamma_table = compile_intervention_rules(rules)
+    group_codes = _category_codes(diagnosed_df['Group'], GROUPS, 'Group')
+    diagnosis_codes = _category_codes(diagnosed_df['Diagnosis'], DIAGNOSIS_CATEGORIES, 'Diagnosis')
+    k = diagnosed_df['K'].to_numpy()
+    m = diagnosed_df['M'].to_numpy()
+    diagnosed_df['K_post'] = k + (delta_k_table[group_codes, diagnosis_codes] + gamma_table[group_codes, diagnosis_codes] * m)
+    diagnosed_df['M_post'] = m + delta_m_table[group_codes, diagnosis_codes]
 
-    # 8. 对 K_post 和 M_post 进行最小-最大标准化
+    # 对 K_post 和 M_post 进行最小-最大标准化
     k_range = k_max - k_min
     m_range = m_max - m_min
 
     diagnosed_df['K_post_norm'] = ((diagnosed_df['K_post'] - k_min) / k_range).clip(0, 1)
     diagnosed_df['M_post_norm'] = ((diagnosed_df['M_post'] - m_min) / m_range).clip(0, 1)
 
-    # 9. 计算干预后学业成就 A_post
+    # 计算干预后学业成就 A_post
     diagnosed_df['A_post'] = 0.5 * diagnosed_df['K_post_norm'] + 0.5 * diagnosed_df['M_post_norm']
 
-    # 10. 计算成就增益 Gain_Score
+    # 计算成就增益 Gain_Score
     diagnosed_df['Gain_Score'] = diagnosed_df['A_post'] - diagnosed_df['A_pre']
+    return diagnosed_df
+
+def run_pipeline(n_samples, mean, cov, alpha, beta, percentile_threshold=0.2, seed=42, checkpoint_dir=None):
+    """在单个进程内依次完成数据生成、诊断和干预模拟，数据全程在内存中传递。
+
+    全局 K/M 最小-最大值在生成数据后只计算一次并向后传递，
+    不再需要从中间 CSV 文件重新读取。
+
+    Args:
+        n_samples (int): 模拟的学生数量。
+        mean (list or np.ndarray): 多维正态分布的均值向量。
+        cov (list or np.ndarray): 多维正态分布的协方差矩阵。
+        alpha (float): 知识（K）在计算学业成就时的权重。
+        beta (float): 动机（M）在计算学业成就时的权重。
+        percentile_threshold (float): 低成就学生的 A_pre 百分位阈值。
+        seed (int): 根随机种子，数据生成与分组各使用由其派生的独立随机流。
+        checkpoint_dir (str, optional): 若给出，则将各步骤的中间结果以与分步脚本相同的文件名写入该目录。
+
+    Returns:
+        pd.DataFrame: 干预模拟结果。
+    """
+    data_seed, group_seed = np.random.SeedSequence(seed).spawn(2)
+    student_df = generate_initial_data(n_samples, mean, cov, alpha, beta, seed=data_seed)
+    global_stats = compute_global_stats(student_df)
+    if checkpoint_dir is not None:
+        os.makedirs(checkpoint_dir, exist_ok=True)
+        write_student_table(student_df, os.path.join(checkpoint_dir, 'initial_student_data.csv'))
+
+    diagnosed_df = diagnose_population(student_df, percentile_threshold)
+    if checkpoint_dir is not None:
+        write_student_table(diagnosed_df, os.path.join(checkpoint_dir, 'diagnosed_student_data.csv'))
+
+    results_df = apply_intervention_model(assign_intervention_groups(diagnosed_df, group_seed), global_stats)
+    if checkpoint_dir is not None:
+        write_student_table(results_df, os.path.join(checkpoint_dir, 'intervention_results.csv'))
+    return results_df
+
+def _simulate_gain_scores(rng, n_replications, n_students, mean, cov, alpha, beta, percentile_threshold, rules):
+    """一次性模拟多次重复实验，重复次数作为数组的第一维。
+
+    逐次重复与 generate_initial_data、diagnose_population、assign_intervention_groups 和
+    apply_intervention_model 的逻辑相同：最小-最大标准化、A_pre 百分位筛选、按低成就群体均值诊断、
+    均等随机分组，再按规则表计算 Gain_Score。
+
+    Returns:
+        tuple[np.ndarray, np.ndarray]: 形状均为 (n_replications, n_students) 的 Gain_Score
+        和组编码（非低成就学生为 -1）。
+    """
+    attributes = rng.multivariate_normal(mean, cov, (n_replications, n_students))
+    k, m = attributes[..., 0], attributes[..., 1]
+    k_min, k_max = k.min(axis=1, keepdims=True), k.max(axis=1, keepdims=True)
+    m_min, m_max = m.min(axis=1, keepdims=True), m.max(axis=1, keepdims=True)
+    k_norm = (k - k_min) / (k_max - k_min)
+    m_norm = (m - m_min) / (m_max - m_min)
+    a_pre = alpha * k_norm + beta * m_norm
+
+    # 低成就学生筛选与诊断（与 step_2 相同的线性插值百分位和位掩码查找表）
+    low = a_pre <= np.quantile(a_pre, percentile_threshold, axis=1, keepdims=True)
+    n_low = low.sum(axis=1, keepdims=True)
+    traits = np.stack([k_norm, m_norm], axis=-1)
+    trait_means = np.where(low[..., None], traits, 0).sum(axis=1, keepdims=True) / n_low[..., None]
+    # 诊断编码按 DIAGNOSIS_CATEGORIES 编码，与 apply_intervention_model 一样直接作为规则表的诊断编码
+    diagnosis_codes = DIAGNOSIS_LOOKUP[trait_masks_from_values(traits, trait_means)]
+
+    # 以随机键排序得到低成就学生的随机名次，再按 np.array_split 的规则切分为各组
+    keys = np.where(low, rng.random(low.shape), np.inf)
+    ranks = np.empty_like(low, dtype=np.int64)
+    np.put_along_axis(ranks, np.argsort(keys, axis=1), np.arange(n_students), axis=1)
+    base, extra = np.divmod(n_low, len(GROUPS))
+    boundaries = np.arange(1, len(GROUPS) + 1) * base + np.minimum(np.arange(1, len(GROUPS) + 1), extra)
+    group_codes = np.where(low, (ranks[..., None] >= boundaries[:, None, :]).sum(axis=-1), -1)
+
+    delta_k_table, delta_m_table, gamma_table = compile_intervention_rules(rules)
+    cell = (group_codes, np.where(low, diagnosis_codes, -1))
+    k_post = k + (delta_k_table[cell] + gamma_table[cell] * m)
+    m_post = m + delta_m_table[cell]
+    k_post_norm = np.clip((k_post - k_min) / (k_max - k_min), 0, 1)
+    m_post_norm = np.clip((m_post - m_min) / (m_max - m_min), 0, 1)
+    gain_scores = 0.5 * k_post_norm + 0.5 * m_post_norm - a_pre
+    return gain_scores, group_codes
+
+def _contrast_t_tests(gain_scores, group_codes, first, second):
+    """对每次重复的两组 Gain_Score 做学生 t 检验（first 组减 second 组）。
+
+    Returns:
+        tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]: 每次重复的 p 值、Cohen's d 和两组人数。
+    """
+    from scipy import stats
+
+    moments = []
+    for group in (first, second):
+        in_group = group_codes == group
+        n = in_group.sum(axis=1)
+        mean = np.where(in_group, gain_scores, 0).sum(axis=1) / n
+        var = np.where(in_group, (gain_scores - mean[:, None]) ** 2, 0).sum(axis=1) / (n - 1)
+        moments.append((n, mean, var))
+    (n1, mean1, var1), (n2, mean2, var2) = moments
+    pooled_var = ((n1 - 1) * var1 + (n2 - 1) * var2) / (n1 + n2 - 2)
+    t_stat = (mean1 - mean2) / np.sqrt(pooled_var * (1 / n1 + 1 / n2))
+    p_values = 2 * stats.t.sf(np.abs(t_stat), n1 + n2 - 2)
+    return p_values, (mean1 - mean2) / np.sqrt(pooled_var), n1, n2
+
+def _wilson_interval(successes, n_trials, z=1.96):
+    """返回二项比例的 Wilson 置信区间，在比例接近 0 或 1 时仍然可靠。"""
+    proportion = successes / n_trials
+    center = (proportion + z ** 2 / (2 * n_trials)) / (1 + z ** 2 / n_trials)
+    half_width = z * np.sqrt(proportion * (1 - proportion) / n_trials + z ** 2 / (4 * n_trials ** 2)) / (1 + z ** 2 / n_trials)
+    return center - half_width, center + half_width
+
+def _power_for_sample_size(seed, n_students, mean, cov, alpha, beta, percentile_threshold, rules, contrast,
+                           significance, target_power, ci_half_width, batch_size, max_replications):
+    """按批次重复模拟某一样本量，直到功效估计的 95% Wilson 置信区间足够窄或达到重复上限。"""
+    from scipy import stats
+
+    rng = np.random.default_rng(seed)
+    first, second = GROUPS.index(contrast[0]), GROUPS.index(contrast[1])
+    p_values, effect_sizes, group_sizes = [], [], []
+    n_done = 0
+    while n_done < max_replications:
+        n_batch = min(batch_size, max_replications - n_done)
+        gain_scores, group_codes = _simulate_gain_scores(
+            rng, n_batch, n_students, mean, cov, alpha, beta, percentile_threshold, rules
+        )
+        p_batch, d_batch, n1, n2 = _contrast_t_tests(gain_scores, group_codes, first, second)
+        p_values.append(p_batch)
+        effect_sizes.append(d_batch)
+        group_sizes.append(np.stack([n1, n2]))
+        n_done += n_batch
+        n_significant = np.count_nonzero(np.concatenate(p_values) < significance)
+        power_ci_low, power_ci_high = _wilson_interval(n_significant, n_done)
+        if (power_ci_high - power_ci_low) / 2 <= ci_half_width:
+            break
+
+    n1, n2 = np.concatenate(group_sizes, axis=1).mean(axis=1)
+    df = n1 + n2 - 2
+    # 给定组规模下以目标功效可检出的最小效应量（Cohen's d）
+    detectable_d = (stats.t.ppf(1 - significance / 2, df) + stats.t.ppf(target_power, df)) * np.sqrt(1 / n1 + 1 / n2)
+    return {
+        'n_students': n_students,
+        'replications': n_done,
+        'group_size': (n1 + n2) / 2,
+        'power': n_significant / n_done,
+        'power_ci_low': power_ci_low,
+        'power_ci_high': power_ci_high,
+        'mean_cohens_d': np.mean(np.concatenate(effect_sizes)),
+        'detectable_d': detectable_d,
+    }
+
+def run_power_analysis(sample_sizes, mean, cov, alpha, beta, percentile_threshold=0.2, rules=INTERVENTION_RULES,
+                       contrast=('Matched', 'General'), significance=0.05, target_power=0.8, ci_half_width=0.01,
+                       batch_size=100, max_replications=5000, seed=42, n_workers=1):
+    """对五组诊断干预设计进行功效分析。
+
+    对每个样本量反复生成学生群体、诊断低成就学生、随机分组并应用干预模型，
+    对 contrast 中两组的 Gain_Score 做 t 检验。重复实验按批次以数组方式模拟，
+    当功效估计的 95% Wilson 置信区间半宽不超过 ci_half_width 时提前停止。
+    各样本量使用由 seed 派生的独立随机流，可在多个进程中并行计算，结果与进程数无关。
+
+    Args:
+        sample_sizes (list): 需要评估的学生总数（低成就学生约占 percentile_threshold）。
+        mean (list or np.ndarray): 多维正态分布的均值向量。
+        cov (list or np.ndarray): 多维正态分布的协方差矩阵。
+        alpha (float): 知识（K）在计算学业成就时的权重。
+        beta (float): 动机（M）在计算学业成就时的权重。
+        percentile_threshold (float): 低成就学生的 A_pre 百分位阈值。
+        rules (list): 干预规则表，格式见 INTERVENTION_RULES。
+        contrast (tuple): 比较的两个组名，检验前者减后者。
+        significance (float): 显著性水平。
+        target_power (float): 计算可检出效应量时的目标功效。
+        ci_half_width (float): 提前停止所需的功效置信区间半宽。
+        batch_size (int): 每批同时模拟的重复次数。
+        max_replications (int): 每个样本量的最大重复次数。
+        seed (int): 根随机种子。
+        n_workers (int): 并行计算的进程数。
+
+    Returns:
+        pd.DataFrame: 每个样本量一行，包含重复次数、平均每组人数、功效及其置信区间、
+                      平均 Cohen's d 和可检出的最小 Cohen's d。
+    """
+    seeds = np.random.SeedSequence(seed).spawn(len(sample_sizes))
+    settings = (mean, cov, alpha, beta, percentile_threshold, rules, contrast,
+                significance, target_power, ci_half_width, batch_size, max_replications)
+    if n_workers > 1:
+        with ProcessPoolExecutor(n_workers) as executor:
+            futures = [executor.submit(_power_for_sample_size, size_seed, n, *settings)
+                       for size_seed, n in zip(seeds, sample_sizes)]
+            rows = [future.result() for future in futures]
+    else:
+        rows = [_power_for_sample_size(size_seed, n, *settings) for size_seed, n in zip(seeds, sample_sizes)]
+    return pd.DataFrame(rows)
+
+def run_intervention_simulation():
+    """执行教育干预模拟，计算干预后分数并保存结果。
+
+    该函数执行以下步骤：
+    1.  加载诊断数据和原始数据。
+    2.  获取 K 和 M 的全局最小/最大值用于标准化。
+    3.  将低成就学生随机分配到五个实验组。
+    4.  根据学生所在组和诊断类型，应用干预模型计算干预后分数、A_post 和 Gain_Score。
+    5.  将结果保存到 CSV 文件。
+    """
+    # 定义文件路径
+    diagnosed_data_path = '/work_dir/data/diagnosed_student_data.csv'
+    initial_data_path = '/work_dir/data/initial_student_data.csv'
+    output_path = '/work_dir/data/intervention_results.csv'
+
+    # 确保输出目录存在
+    output_dir = os.path.dirname(output_path)
+    if not os.path.exists(output_dir):
+        os.makedirs(output_dir)
+
+    # 1. 加载数据
+    diagnosed_df = read_student_table(diagnosed_data_path)
+    initial_df = read_student_table(initial_data_path, usecols=['K', 'M'])
+
+    # 2. 从 initial_student_data.csv 获取全局 K 和 M 的最小-最大值
+    global_stats = compute_global_stats(initial_df)
+
+    # 3. - 4. 分组并应用干预模型
+    assign_intervention_groups(diagnosed_df, seed=42)
+    apply_intervention_model(diagnosed_df, global_stats)
 
-    # 11. 保存更新后的 DataFrame
-    diagnosed_df.to_csv(output_path, index=False)
+    # 5. 保存更新后的 DataFrame
+    write_student_table(diagnosed_df, output_path)
 
-    # 12. 打印确认信息和结果预览
+    # 打印确认信息和结果预览
     print(f"Intervention results successfully saved to {output_path}")
     print("\nPreview of the final data:")
     print(diagnosed_df.head())
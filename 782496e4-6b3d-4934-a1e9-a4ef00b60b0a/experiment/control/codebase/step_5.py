@@ -1,12 +1,8 @@
 import os
 import pandas as pd
 import numpy as np
-import scipy.stats as stats
-import statsmodels.api as sm
-from statsmodels.formula.api import ols
-import matplotlib
-matplotlib.use('Agg')
-import matplotlib.pyplot as plt
+from itertools import combinations
+from concurrent.futures import ProcessPoolExecutor
 
 def create_dummy_data(file_path):
     """Generates and saves dummy intervention results data to a CSV file.
@@ -20,14 +16,14 @@ def create_dummy_data(file_path):
     Args:
         file_path (str): The full path to the output CSV file.
     """
-    np.random.seed(42)
+    rng = np.random.default_rng(42)
     n_per_group = 50
     
     participant_ids = range(1, n_per_group * 3 + 1)
     
-    control_scores = np.random.normal(loc=5, scale=4, size=n_per_group)
-    generic_scores = np.random.normal(loc=12, scale=4.5, size=n_per_group)
-    matched_scores = np.random.normal(loc=18, scale=5, size=n_per_group)
+    control_scores = rng.normal(loc=5, scale=4, size=n_per_group)
+    generic_scores = rng.normal(loc=12, scale=4.5, size=n_per_group)
+    matched_scores = rng.normal(loc=18, scale=5, size=n_per_group)
     
     conditions = ['Control'] * n_per_group + \
                  ['Generic Intervention'] * n_per_group + \
@@ -44,29 +40,215 @@ def create_dummy_data(file_path):
     df = pd.DataFrame(data)
     df.to_csv(file_path, index=False)
 
-def calculate_cohens_d(group1, group2):
-    """Calculates Cohen's d for two independent groups.
+def compare_groups(outcomes, group_codes, n_groups, pairs=None, equal_var=True):
+    """Computes a one-way ANOVA, pairwise t-tests and Cohen's d for many outcomes at once.
 
-    Cohen's d is an effect size used to indicate the standardized difference
-    between two means. It is calculated as the difference between the means
-    divided by the pooled standard deviation.
+    Every column of `outcomes` is analysed independently against the same
+    group assignment, so replications, resamples or several outcome
+    variables can be reported in one vectorized call. Group sums are taken
+    with a single one-hot matrix product instead of per-group filtering.
 
     Args:
-        group1 (pd.Series or np.ndarray): Data for the first group.
-        group2 (pd.Series or np.ndarray): Data for the second group.
+        outcomes (np.ndarray): Outcome values of shape (n_obs,) or (n_obs, n_outcomes).
+        group_codes (np.ndarray): Integer group code (0 to n_groups - 1) of each observation.
+        n_groups (int): Number of groups.
+        pairs (list): (i, j) group-code pairs to contrast as group i minus group j.
+                      Defaults to every pair with i < j.
+        equal_var (bool): Student's pooled-variance t-test if True, Welch's test otherwise.
 
     Returns:
-        float: The calculated Cohen's d value.
+        dict: Arrays with a trailing n_outcomes axis (dropped for 1-D input):
+              'counts' (n_groups,), 'means' and 'variances' (n_groups, ...),
+              'ss_between', 'ss_within', 'df_between', 'df_within', 'F' and 'anova_p',
+              'pairs' (the contrasted pairs) and 't', 'df', 'p' and 'cohens_d'
+              with a leading n_pairs axis.
+
+    Raises:
+        ValueError: If any group code lies outside 0 to n_groups - 1.
     """
-    n1, n2 = len(group1), len(group2)
-    s1, s2 = np.var(group1, ddof=1), np.var(group2, ddof=1)
-    
-    pooled_std = np.sqrt(((n1 - 1) * s1 + (n2 - 1) * s2) / (n1 + n2 - 2))
-    
-    mean1, mean2 = np.mean(group1), np.mean(group2)
-    
-    d = (mean1 - mean2) / pooled_std
-    return d
+    import scipy.stats as stats
+
+    outcomes = np.asarray(outcomes, dtype=float)
+    squeeze = outcomes.ndim == 1
+    if squeeze:
+        outcomes = outcomes[:, None]
+    group_codes = np.asarray(group_codes)
+    # Code -1 (an unknown or missing label from Categorical.codes) would otherwise index the last group.
+    invalid = (group_codes < 0) | (group_codes >= n_groups)
+    if invalid.any():
+        raise ValueError(str(np.count_nonzero(invalid)) + " observations have group codes outside 0 to "
+                         + str(n_groups - 1) + "; drop or relabel them before comparing groups.")
+    if pairs is None:
+        pairs = list(combinations(range(n_groups), 2))
+
+    one_hot = np.zeros((len(group_codes), n_groups))
+    one_hot[np.arange(len(group_codes)), group_codes] = 1.0
+    counts = one_hot.sum(axis=0)
+    means = one_hot.T @ outcomes / counts[:, None]
+    residuals = outcomes - means[group_codes]
+    variances = one_hot.T @ residuals ** 2 / (counts[:, None] - 1)
+
+    n_total = counts.sum()
+    grand_mean = (counts[:, None] * means).sum(axis=0) / n_total
+    ss_between = (counts[:, None] * (means - grand_mean) ** 2).sum(axis=0)
+    ss_within = ((counts[:, None] - 1) * variances).sum(axis=0)
+    df_between = n_groups - 1
+    df_within = n_total - n_groups
+    f_stat = (ss_between / df_between) / (ss_within / df_within)
+    anova_p = stats.f.sf(f_stat, df_between, df_within)
+
+    first, second = np.array(pairs).T
+    n1, n2 = counts[first][:, None], counts[second][:, None]
+    v1, v2 = variances[first], variances[second]
+    mean_diff = means[first] - means[second]
+    pooled_var = ((n1 - 1) * v1 + (n2 - 1) * v2) / (n1 + n2 - 2)
+    if equal_var:
+        t_df = np.broadcast_to(n1 + n2 - 2, mean_diff.shape)
+        t_stat = mean_diff / np.sqrt(pooled_var * (1 / n1 + 1 / n2))
+    else:
+        se1, se2 = v1 / n1, v2 / n2
+        t_df = (se1 + se2) ** 2 / (se1 ** 2 / (n1 - 1) + se2 ** 2 / (n2 - 1))
+        t_stat = mean_diff / np.sqrt(se1 + se2)
+    t_p = 2 * stats.t.sf(np.abs(t_stat), t_df)
+
+    results = {
+        'counts': counts,
+        'means': means,
+        'variances': variances,
+        'ss_between': ss_between,
+        'ss_within': ss_within,
+        'df_between': df_between,
+        'df_within': df_within,
+        'F': f_stat,
+        'anova_p': anova_p,
+        'pairs': pairs,
+        't': t_stat,
+        'df': t_df,
+        'p': t_p,
+        'cohens_d': mean_diff / np.sqrt(pooled_var),
+    }
+    if squeeze:
+        for key in ('means', 'variances', 'ss_between', 'ss_within', 'F', 'anova_p', 't', 'df', 'p', 'cohens_d'):
+            results[key] = results[key][..., 0]
+    return results
+
+# Data shared by the resampling workers; set once per process by _init_resampling_worker.
+_RESAMPLING_DATA = {}
+
+def _init_resampling_worker(values, group_codes, n_groups, pairs):
+    """Stores the observed data in a worker process so batches only carry seeds."""
+    _RESAMPLING_DATA['values'] = values
+    _RESAMPLING_DATA['group_codes'] = group_codes
+    _RESAMPLING_DATA['n_groups'] = n_groups
+    _RESAMPLING_DATA['pairs'] = pairs
+
+def _permutation_batch(seed, n_resamples):
+    """Runs one batch of label permutations.
+
+    Returns:
+        tuple[np.ndarray, np.ndarray]: The permuted F statistics (n_resamples,)
+                                       and t statistics (n_pairs, n_resamples).
+    """
+    values = _RESAMPLING_DATA['values']
+    rng = np.random.default_rng(seed)
+    # Each row of the index matrix is one permutation of the observations.
+    indices = rng.permuted(np.tile(np.arange(len(values)), (n_resamples, 1)), axis=1)
+    results = compare_groups(values[indices].T, _RESAMPLING_DATA['group_codes'], _RESAMPLING_DATA['n_groups'],
+                             _RESAMPLING_DATA['pairs'])
+    return results['F'], results['t']
+
+def _bootstrap_batch(seed, n_resamples):
+    """Runs one batch of within-group bootstrap resamples.
+
+    Returns:
+        np.ndarray: Bootstrap Cohen's d of shape (n_pairs, n_resamples).
+    """
+    values = _RESAMPLING_DATA['values']
+    group_codes = _RESAMPLING_DATA['group_codes']
+    rng = np.random.default_rng(seed)
+    # Resampling within each group keeps the group sizes of the observed design.
+    order = np.argsort(group_codes, kind='stable')
+    blocks = []
+    for group in range(_RESAMPLING_DATA['n_groups']):
+        members = np.flatnonzero(group_codes == group)
+        blocks.append(members[rng.integers(0, len(members), (n_resamples, len(members)))])
+    indices = np.concatenate(blocks, axis=1)
+    results = compare_groups(values[indices].T, group_codes[order], _RESAMPLING_DATA['n_groups'],
+                             _RESAMPLING_DATA['pairs'])
+    return results['cohens_d']
+
+def _run_batches(batch_function, n_resamples, batch_size, seed, init_args, n_workers):
+    """Runs resampling batches serially or in a process pool.
+
+    Every batch draws from its own stream spawned from the SeedSequence `seed`, so the
+    results are identical for any number of workers.
+    """
+    batch_sizes = [min(batch_size, n_resamples - start) for start in range(0, n_resamples, batch_size)]
+    seeds = seed.spawn(len(batch_sizes))
+    if n_workers > 1:
+        with ProcessPoolExecutor(n_workers, initializer=_init_resampling_worker, initargs=init_args) as executor:
+            return list(executor.map(batch_function, seeds, batch_sizes))
+    _init_resampling_worker(*init_args)
+    return [batch_function(batch_seed, size) for batch_seed, size in zip(seeds, batch_sizes)]
+
+def resampling_inference(values, group_codes, n_groups, pairs=None, n_permutations=10000, n_bootstrap=10000,
+                         confidence=0.95, batch_size=1000, seed=None, n_workers=1):
+    """Permutation tests and bootstrap confidence intervals for group comparisons.
+
+    Resamples are drawn as batched index matrices and scored with
+    `compare_groups`, one batch per task. The permutation tests shuffle the
+    group labels for the ANOVA F and for each pairwise t; the bootstrap
+    resamples within groups for the percentile CI of each Cohen's d.
+
+    Args:
+        values (np.ndarray): Outcome value of each observation, e.g. 'Gain_Score'.
+        group_codes (np.ndarray): Integer group code (0 to n_groups - 1) of each observation.
+        n_groups (int): Number of groups.
+        pairs (list): (i, j) group-code pairs to contrast; defaults to every pair with i < j.
+        n_permutations (int): Number of label permutations.
+        n_bootstrap (int): Number of bootstrap resamples.
+        confidence (float): Confidence level of the bootstrap intervals.
+        batch_size (int): Resamples per batch; bounds the index matrix held in memory.
+        seed (int or np.random.SeedSequence): Root seed of the resampling streams.
+        n_workers (int): Number of worker processes. Serial by default; a pool only
+                         pays off when the data or the number of resamples is large.
+
+    Returns:
+        dict: 'pairs', the observed 'F', 't' and 'cohens_d', the permutation
+              p-values 'anova_p' and 'pair_p', and 'cohens_d_ci' of shape (n_pairs, 2).
+    """
+    values = np.asarray(values, dtype=float)
+    group_codes = np.asarray(group_codes)
+    if pairs is None:
+        pairs = list(combinations(range(n_groups), 2))
+    observed = compare_groups(values, group_codes, n_groups, pairs)
+    init_args = (values, group_codes, n_groups, pairs)
+    if not isinstance(seed, np.random.SeedSequence):
+        seed = np.random.SeedSequence(seed)
+    permutation_seed, bootstrap_seed = seed.spawn(2)
+
+    permutations = _run_batches(_permutation_batch, n_permutations, batch_size, permutation_seed, init_args, n_workers)
+    permuted_f = np.concatenate([batch[0] for batch in permutations])
+    permuted_t = np.concatenate([batch[1] for batch in permutations], axis=1)
+    # The +1 counts the observed labelling among the permutations.
+    anova_p = (np.count_nonzero(permuted_f >= observed['F']) + 1) / (n_permutations + 1)
+    pair_p = ((np.abs(permuted_t) >= np.abs(observed['t'])[:, None]).sum(axis=1) + 1) / (n_permutations + 1)
+
+    bootstrap_d = np.concatenate(
+        _run_batches(_bootstrap_batch, n_bootstrap, batch_size, bootstrap_seed, init_args, n_workers), axis=1
+    )
+    alpha = 1 - confidence
+    cohens_d_ci = np.quantile(bootstrap_d, [alpha / 2, 1 - alpha / 2], axis=1).T
+
+    return {
+        'pairs': pairs,
+        'F': observed['F'],
+        't': observed['t'],
+        'cohens_d': observed['cohens_d'],
+        'anova_p': anova_p,
+        'pair_p': pair_p,
+        'cohens_d_ci': cohens_d_ci,
+    }
 
 def get_significance_stars(p_value):
     """Converts a p-value into a string of significance stars.
@@ -119,9 +301,21 @@ def main():
     results_string += "1. Descriptive Statistics:\n"
     results_string += desc_stats.to_string() + "\n\n"
     
+    group_order = ['Control', 'Generic Intervention', 'Diagnostic-Matched']
+    group_codes = pd.Categorical(df['Intervention_Condition'], categories=group_order).codes
+    # Contrasts reported below: Diagnostic-Matched minus Generic Intervention, and minus Control.
+    comparison_results = compare_groups(df['Gain_Score'].to_numpy(), group_codes, len(group_order), pairs=[(2, 1), (2, 0)])
+
     print("\n--- One-Way ANOVA ---")
-    model = ols('Gain_Score ~ C(Intervention_Condition)', data=df).fit()
-    anova_table = sm.stats.anova_lm(model, typ=2)
+    anova_table = pd.DataFrame(
+        {
+            'sum_sq': [float(comparison_results['ss_between']), float(comparison_results['ss_within'])],
+            'df': [float(comparison_results['df_between']), float(comparison_results['df_within'])],
+            'F': [float(comparison_results['F']), np.nan],
+            'PR(>F)': [float(comparison_results['anova_p']), np.nan],
+        },
+        index=['C(Intervention_Condition)', 'Residual']
+    )
     print(anova_table)
     results_string += "2. One-Way ANOVA Results:\n"
     results_string += anova_table.to_string() + "\n\n"
@@ -133,33 +327,52 @@ def main():
     print("\n--- Independent T-Tests ---")
     results_string += "3. Independent Samples T-Tests:\n"
     
-    ttest_dm_vs_gi = stats.ttest_ind(group_dm, group_gi)
-    print("Diagnostic-Matched vs. Generic Intervention: t=" + str(ttest_dm_vs_gi.statistic) + ", p=" + str(ttest_dm_vs_gi.pvalue))
-    results_string += "- Diagnostic-Matched vs. Generic Intervention: t=" + str(ttest_dm_vs_gi.statistic) + ", p=" + str(ttest_dm_vs_gi.pvalue) + "\n"
+    t_dm_vs_gi, t_dm_vs_c = comparison_results['t']
+    p_dm_vs_gi, p_dm_vs_c = comparison_results['p']
+    print("Diagnostic-Matched vs. Generic Intervention: t=" + str(t_dm_vs_gi) + ", p=" + str(p_dm_vs_gi))
+    results_string += "- Diagnostic-Matched vs. Generic Intervention: t=" + str(t_dm_vs_gi) + ", p=" + str(p_dm_vs_gi) + "\n"
     
-    ttest_dm_vs_c = stats.ttest_ind(group_dm, group_c)
-    print("Diagnostic-Matched vs. Control: t=" + str(ttest_dm_vs_c.statistic) + ", p=" + str(ttest_dm_vs_c.pvalue))
-    results_string += "- Diagnostic-Matched vs. Control: t=" + str(ttest_dm_vs_c.statistic) + ", p=" + str(ttest_dm_vs_c.pvalue) + "\n\n"
+    print("Diagnostic-Matched vs. Control: t=" + str(t_dm_vs_c) + ", p=" + str(p_dm_vs_c))
+    results_string += "- Diagnostic-Matched vs. Control: t=" + str(t_dm_vs_c) + ", p=" + str(p_dm_vs_c) + "\n\n"
     
     print("\n--- Cohen's d Effect Size ---")
     results_string += "4. Cohen's d Effect Size:\n"
     
-    cohen_d_dm_vs_gi = calculate_cohens_d(group_dm, group_gi)
+    cohen_d_dm_vs_gi, cohen_d_dm_vs_c = comparison_results['cohens_d']
     print("Diagnostic-Matched vs. Generic Intervention: d=" + str(cohen_d_dm_vs_gi))
     results_string += "- Diagnostic-Matched vs. Generic Intervention: d=" + str(cohen_d_dm_vs_gi) + "\n"
     
-    cohen_d_dm_vs_c = calculate_cohens_d(group_dm, group_c)
     print("Diagnostic-Matched vs. Control: d=" + str(cohen_d_dm_vs_c))
     results_string += "- Diagnostic-Matched vs. Control: d=" + str(cohen_d_dm_vs_c) + "\n"
     
+    print("\n--- Resampling Inference ---")
+    results_string += "\n5. Resampling Inference (10000 permutations, 10000 bootstrap resamples):\n"
+    resampling_results = resampling_inference(
+        df['Gain_Score'].to_numpy(), group_codes, len(group_order), pairs=[(2, 1), (2, 0)],
+        seed=42
+    )
+    anova_line = "- One-Way ANOVA: permutation p=" + str(resampling_results['anova_p'])
+    print(anova_line)
+    results_string += anova_line + "\n"
+    for name, pair_p, (ci_low, ci_high) in zip(
+        ['Diagnostic-Matched vs. Generic Intervention', 'Diagnostic-Matched vs. Control'],
+        resampling_results['pair_p'], resampling_results['cohens_d_ci']
+    ):
+        pair_line = "- " + name + ": permutation p=" + str(pair_p) + ", d 95% CI=[" + str(ci_low) + ", " + str(ci_high) + "]"
+        print(pair_line)
+        results_string += pair_line + "\n"
+    
     with open(output_txt_path, 'w') as f:
         f.write(results_string)
     print("\nStatistical results saved to " + output_txt_path)
 
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+
     matplotlib.rcParams['text.usetex'] = False
     fig, ax = plt.subplots(figsize=(10, 7))
     
-    group_order = ['Control', 'Generic Intervention', 'Diagnostic-Matched']
     data_to_plot = [group_c, group_gi, group_dm]
     
     ax.boxplot(data_to_plot, labels=group_order, patch_artist=True)
@@ -174,8 +387,8 @@ def main():
     bar_height_step = y_range * 0.1
     
     comparisons = [
-        (1, 3, ttest_dm_vs_c.pvalue), 
-        (2, 3, ttest_dm_vs_gi.pvalue)
+        (1, 3, p_dm_vs_c), 
+        (2, 3, p_dm_vs_gi)
     ]
     
     bar_y_start = y_max + bar_height_step * 0.5
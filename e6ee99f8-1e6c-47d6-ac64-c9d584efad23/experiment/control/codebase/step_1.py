@@ -2,6 +2,24 @@ import os
 import pandas as pd
 import numpy as np
 import datetime
+from concurrent.futures import ProcessPoolExecutor
+
+
+def spawn_generators(seed, n_streams):
+    """
+    Spawns independent random generators from one seed.
+
+    Each block of investors or commitments draws from its own stream, so results
+    do not depend on how the work is split across processes.
+
+    Args:
+        seed (int): The root random seed.
+        n_streams (int): The number of independent streams.
+
+    Returns:
+        list: `n_streams` np.random.Generator objects.
+    """
+    return [np.random.default_rng(child) for child in np.random.SeedSequence(seed).spawn(n_streams)]
 
 def generate_investor_profiles(num_investors, seed):
     """
@@ -16,16 +34,16 @@ def generate_investor_profiles(num_investors, seed):
                       'investor_id', 'age', 'initial_net_worth_m',
                       'risk_tolerance', and 'liquidity_needs'.
     """
-    np.random.seed(seed)
+    rng = np.random.default_rng(seed)
     investor_ids = np.arange(1, num_investors + 1)
-    ages = np.random.randint(35, 71, size=num_investors)
-    net_worths = np.round(np.random.lognormal(mean=2.5, sigma=0.8, size=num_investors) + 5, 2)
-    risk_tolerances = np.random.choice(
+    ages = rng.integers(35, 71, size=num_investors)
+    net_worths = np.round(rng.lognormal(mean=2.5, sigma=0.8, size=num_investors) + 5, 2)
+    risk_tolerances = rng.choice(
         ['Low', 'Medium', 'High'],
         size=num_investors,
         p=[0.2, 0.5, 0.3]
     )
-    liquidity_needs = np.random.choice(
+    liquidity_needs = rng.choice(
         ['Low', 'Medium', 'High'],
         size=num_investors,
         p=[0.4, 0.4, 0.2]
@@ -53,15 +71,15 @@ def generate_fund_information(num_funds, start_date_str, seed):
         pd.DataFrame: A DataFrame containing fund information with columns:
                       'fund_id', 'vintage_year', 'strategy', 'target_size_m'.
     """
-    np.random.seed(seed)
+    rng = np.random.default_rng(seed)
     fund_ids = np.arange(1, num_funds + 1)
     start_year = pd.to_datetime(start_date_str).year
-    vintage_years = np.random.randint(start_year - 3, start_year + 4, size=num_funds)
-    strategies = np.random.choice(
+    vintage_years = rng.integers(start_year - 3, start_year + 4, size=num_funds)
+    strategies = rng.choice(
         ['Buyout', 'Venture Capital', 'Growth Equity', 'Real Estate', 'Infrastructure'],
         size=num_funds
     )
-    target_sizes = np.round(np.random.lognormal(mean=6, sigma=1, size=num_funds), 0)
+    target_sizes = np.round(rng.lognormal(mean=6, sigma=1, size=num_funds), 0)
 
     funds_df = pd.DataFrame({
         'fund_id': fund_ids,
@@ -71,7 +89,7 @@ def generate_fund_information(num_funds, start_date_str, seed):
     })
     return funds_df
 
-def simulate_economic_conditions(start_date_str, end_date_str, stress_periods):
+def simulate_economic_conditions(start_date_str, end_date_str, stress_periods, seed):
     """
     Simulates a time series of economic conditions, including stress periods.
 
@@ -81,6 +99,7 @@ def simulate_economic_conditions(start_date_str, end_date_str, stress_periods):
         stress_periods (list of tuples): A list where each tuple contains
                                           the start and end date of a stress
                                           period, e.g., [('YYYY-MM-DD', 'YYYY-MM-DD')].
+        seed (int): The random seed for reproducibility.
 
     Returns:
         pd.DataFrame: A DataFrame with 'date', 'economic_index', and
@@ -95,19 +114,98 @@ def simulate_economic_conditions(start_date_str, end_date_str, stress_periods):
         economic_df.loc[start:end, 'is_stress_period'] = True
 
     # Simulate index values
-    daily_returns = np.random.normal(loc=0.0003, scale=0.01, size=len(economic_df))
-    stress_returns = np.random.normal(loc=-0.001, scale=0.025, size=len(economic_df))
+    rng = np.random.default_rng(seed)
+    daily_returns = rng.normal(loc=0.0003, scale=0.01, size=len(economic_df))
+    stress_returns = rng.normal(loc=-0.001, scale=0.025, size=len(economic_df))
     
     returns = np.where(economic_df['is_stress_period'], stress_returns, daily_returns)
     
     economic_df['economic_index'] = 100 * (1 + pd.Series(returns, index=dates)).cumprod()
     
-    return economic_df.resample('Q').last()
+    return economic_df.resample('QE').last()
+
+# Investors per random stream when generating commitments.
+COMMITMENT_BLOCK_SIZE = 100000
+
+def _sample_distinct(rng, population, counts, max_count):
+    """
+    Samples up to `max_count` distinct positions in range(population) per row.
+
+    Column j is redrawn wherever it repeats an earlier column of its row, which
+    is sequential sampling without replacement. Only the first `counts[i]`
+    columns of row i are meaningful.
+
+    Args:
+        rng (np.random.Generator): The random stream.
+        population (int): The number of items to sample from.
+        counts (np.ndarray): The number of items wanted in each row.
+        max_count (int): The number of columns to sample.
+
+    Returns:
+        np.ndarray: An (len(counts), max_count) array of positions.
+    """
+    samples = rng.integers(0, population, size=(len(counts), max_count))
+    for column in range(1, max_count):
+        repeated = np.flatnonzero((samples[:, [column]] == samples[:, :column]).any(axis=1) & (column < counts))
+        while len(repeated):
+            samples[repeated, column] = rng.integers(0, population, size=len(repeated))
+            still_repeated = (samples[repeated, column][:, None] == samples[repeated, :column]).any(axis=1)
+            repeated = repeated[still_repeated]
+    return samples
+
+def _generate_commitment_block(investor_ids, net_worths, base_allocations, fund_ids, fund_vintages, start_date, rng):
+    """
+    Generates the commitments of one block of investors with array operations.
+
+    Args:
+        investor_ids (np.ndarray): Investor IDs.
+        net_worths (np.ndarray): Investor net worths in $M.
+        base_allocations (np.ndarray): Mean allocation per commitment.
+        fund_ids (np.ndarray): Fund IDs.
+        fund_vintages (np.ndarray): Fund vintage years, aligned with `fund_ids`.
+        start_date (np.datetime64): The simulation start date.
+        rng (np.random.Generator): The block's random stream.
+
+    Returns:
+        dict: The commitment columns as arrays.
+    """
+    # Each investor commits to 1-4 distinct funds
+    num_investments = np.minimum(rng.integers(1, 5, size=len(investor_ids)), len(fund_ids))
+    fund_rows = _sample_distinct(rng, len(fund_ids), num_investments, num_investments.max(initial=0))
+    chosen = np.arange(fund_rows.shape[1]) < num_investments[:, None]
+    fund_rows = fund_rows[chosen]
+    investor_rows = np.repeat(np.arange(len(investor_ids)), num_investments)
+
+    allocation_pct = rng.normal(loc=base_allocations[investor_rows], scale=0.02)
+    commitment_amounts = np.maximum(0.1, np.round(net_worths[investor_rows] * allocation_pct, 2))
+
+    # Commitments happen around the fund's vintage year
+    commitment_years = fund_vintages[fund_rows] + rng.integers(-1, 2, size=len(fund_rows))
+    commitment_months = rng.integers(1, 13, size=len(fund_rows))
+    commitment_days = rng.integers(1, 29, size=len(fund_rows))
+    commitment_dates = (
+        ((commitment_years - 1970) * 12 + commitment_months - 1).astype('datetime64[M]').astype('datetime64[D]')
+        + (commitment_days - 1)
+    )
+
+    early = np.flatnonzero(commitment_dates < start_date)
+    commitment_dates[early] = start_date + rng.integers(0, 365, size=len(early))
+
+    return {
+        'investor_id': investor_ids[investor_rows],
+        'fund_id': fund_ids[fund_rows],
+        'commitment_date': commitment_dates.astype('datetime64[ns]'),
+        'commitment_amount_m': commitment_amounts
+    }
 
 def generate_commitments(investors_df, funds_df, start_date_str, seed):
     """
     Generates investment commitments from investors to funds.
 
+    Investors are processed in blocks of COMMITMENT_BLOCK_SIZE, each with its
+    own stream spawned from `seed`. Funds are sampled by row, so vintages are
+    gathered by position rather than looked up by fund ID.
+
     Args:
         investors_df (pd.DataFrame): DataFrame of investor profiles.
         funds_df (pd.DataFrame): DataFrame of fund information.
@@ -118,143 +216,238 @@ def generate_commitments(investors_df, funds_df, start_date_str, seed):
         pd.DataFrame: A DataFrame of commitments with columns: 'investor_id',
                       'fund_id', 'commitment_date', 'commitment_amount_m'.
     """
-    np.random.seed(seed)
-    commitments = []
     risk_map = {'Low': 0.05, 'Medium': 0.1, 'High': 0.15}
     
-    start_date = pd.to_datetime(start_date_str)
-    
-    for _, investor in investors_df.iterrows():
-        num_investments = np.random.randint(1, 5)
-        funds_to_invest = np.random.choice(funds_df['fund_id'], num_investments, replace=False)
-        
-        for fund_id in funds_to_invest:
-            base_alloc = risk_map[investor['risk_tolerance']]
-            allocation_pct = np.random.normal(loc=base_alloc, scale=0.02)
-            commitment_amount = max(0.1, round(investor['initial_net_worth_m'] * allocation_pct, 2))
-            
-            fund_vintage = funds_df[funds_df['fund_id'] == fund_id]['vintage_year'].iloc[0]
-            
-            # Commitments happen around the fund's vintage year
-            commitment_year = fund_vintage + np.random.randint(-1, 2)
-            commitment_month = np.random.randint(1, 13)
-            commitment_day = np.random.randint(1, 29)
-            commitment_date = pd.to_datetime(str(commitment_year) + '-' + str(commitment_month) + '-' + str(commitment_day))
-            
-            if commitment_date < start_date:
-                commitment_date = start_date + pd.DateOffset(days=np.random.randint(0, 365))
-
-            commitments.append({
-                'investor_id': investor['investor_id'],
-                'fund_id': fund_id,
-                'commitment_date': commitment_date,
-                'commitment_amount_m': commitment_amount
-            })
-            
-    return pd.DataFrame(commitments)
-
-def simulate_fund_lifecycle(commitments_df, economic_df, end_date_str, seed):
+    start_date = np.datetime64(pd.to_datetime(start_date_str).date(), 'D')
+    investor_ids = investors_df['investor_id'].to_numpy()
+    net_worths = investors_df['initial_net_worth_m'].to_numpy(dtype=float)
+    base_allocations = investors_df['risk_tolerance'].map(risk_map).to_numpy(dtype=float)
+    fund_ids = funds_df['fund_id'].to_numpy()
+    fund_vintages = funds_df['vintage_year'].to_numpy()
+
+    blocks = [slice(start, start + COMMITMENT_BLOCK_SIZE) for start in range(0, len(investors_df), COMMITMENT_BLOCK_SIZE)]
+    generators = spawn_generators(seed, len(blocks))
+    commitments = [
+        _generate_commitment_block(
+            investor_ids[block], net_worths[block], base_allocations[block], fund_ids, fund_vintages, start_date, rng
+        )
+        for block, rng in zip(blocks, generators)
+    ]
+    columns = ['investor_id', 'fund_id', 'commitment_date', 'commitment_amount_m']
+    if not commitments:
+        return pd.DataFrame(columns=columns)
+    return pd.DataFrame({column: np.concatenate([block[column] for block in commitments]) for column in columns})
+
+# Commitments per random stream in the lifecycle engine. Blocks, not workers,
+# own the streams, so the output is identical for any number of workers.
+LIFECYCLE_BLOCK_SIZE = 100000
+
+def _quarter_grid(commitment_dates, economic_df, end_date):
+    """
+    Lays out the shared quarter-end grid and the economic conditions on it.
+
+    Args:
+        commitment_dates (pd.DatetimeIndex): The commitment dates.
+        economic_df (pd.DataFrame): DataFrame of quarterly economic conditions.
+        end_date (pd.Timestamp): The simulation end date.
+
+    Returns:
+        tuple: The quarter-end dates (datetime64 array), and the economic index
+               and stress flag in force at each of them (as `economic_df.asof`).
+    """
+    grid = pd.date_range(start=commitment_dates.min(), end=end_date, freq='QE').to_numpy()
+    positions = economic_df.index.searchsorted(grid, side='right') - 1
+    known = positions >= 0
+    eco_index = np.where(known, economic_df['economic_index'].to_numpy()[positions], np.nan)
+    is_stress = known & economic_df['is_stress_period'].to_numpy(dtype=bool)[positions]
+    return grid, eco_index, is_stress
+
+def _simulate_lifecycle_block(amounts, commitment_dates, first_quarter, last_quarter, grid, eco_index, is_stress, rng,
+                              nav=None, calls=None, distributions=None):
+    """
+    Steps the NAV of a block of commitments through the quarter grid at once.
+
+    Each quarter, the call, growth and distribution draws are sampled as arrays
+    over the commitments that are live in that quarter. Results are written
+    straight into per-row arrays with one row per commitment and live quarter,
+    ordered by commitment and then quarter, so no sorting is needed afterwards.
+
+    Args:
+        amounts (np.ndarray): Commitment amounts.
+        commitment_dates (np.ndarray): Commitment dates (datetime64).
+        first_quarter (np.ndarray): First live grid quarter of each commitment.
+        last_quarter (np.ndarray): Last live grid quarter of each commitment.
+        grid (np.ndarray): Quarter-end dates (datetime64).
+        eco_index (np.ndarray): Economic index at each grid quarter.
+        is_stress (np.ndarray): Stress flag at each grid quarter.
+        rng (np.random.Generator): The block's random stream.
+        nav, calls, distributions (np.ndarray, optional): Output buffers for the
+            block's rows; allocated if not given.
+
+    Returns:
+        tuple: Per-row NAV, capital call amount and distribution amount, with
+               NaN where no call or distribution was made.
+    """
+    rows_per_commitment = np.maximum(last_quarter - first_quarter + 1, 0)
+    row_start = np.cumsum(rows_per_commitment) - rows_per_commitment
+    n_rows = int(rows_per_commitment.sum())
+    if nav is None:
+        nav, calls, distributions = np.empty(n_rows), np.empty(n_rows), np.empty(n_rows)
+    calls.fill(np.nan)
+    distributions.fill(np.nan)
+
+    capital_called = np.zeros(len(amounts))
+    current_nav = np.zeros(len(amounts))
+
+    for quarter in range(first_quarter.min(initial=len(grid)), last_quarter.max(initial=-1) + 1):
+        live = np.flatnonzero((first_quarter <= quarter) & (quarter <= last_quarter))
+        if len(live) == 0:
+            continue
+        rows = row_start[live] + (quarter - first_quarter[live])
+        quarter_end_date = grid[quarter]
+        years_since_commit = (quarter_end_date - commitment_dates[live]).astype('timedelta64[D]').astype(np.int64) / 365.25
+        eco_multiplier = eco_index[quarter] / 100.0
+        stress = is_stress[quarter]
+        total_commitment = amounts[live]
+
+        # 1. Capital Calls (Investment Period: Years 0-5), more likely in early years
+        can_call = (years_since_commit <= 5) & (capital_called[live] < total_commitment)
+        called = can_call & (rng.random(len(live)) < (0.8 / (1 + years_since_commit)))
+        call_amount = np.minimum(total_commitment - capital_called[live], rng.uniform(0.05, 0.20, len(live)) * total_commitment)
+        called &= call_amount > 0.01
+        capital_called[live[called]] += call_amount[called]
+        current_nav[live[called]] += call_amount[called]
+        calls[rows[called]] = call_amount[called]
+
+        # 2. NAV Growth, halved in stress periods
+        growing = current_nav[live] > 0
+        base_growth = rng.normal(0.03, 0.015, len(live))
+        growth_rate = base_growth * (eco_multiplier * 0.5 if stress else eco_multiplier)
+        current_nav[live[growing]] *= 1 + growth_rate[growing]
+
+        # 3. Distributions (Harvesting Period: Years 4-12), reduced in stress periods
+        can_distribute = (years_since_commit > 4) & (current_nav[live] > 0)
+        distributed = can_distribute & (rng.random(len(live)) < (0.6 * ((years_since_commit - 4) / 8)))
+        dist_amount = current_nav[live] * rng.uniform(0.02, 0.10, len(live)) * (eco_multiplier * 0.25 if stress else eco_multiplier)
+        distributed &= dist_amount > 0.01
+        current_nav[live[distributed]] -= dist_amount[distributed]
+        distributions[rows[distributed]] = dist_amount[distributed]
+
+        # Record NAV at end of quarter; NAV cannot be negative
+        nav[rows] = np.maximum(0, current_nav[live])
+
+    return nav, calls, distributions
+
+def simulate_fund_lifecycle(commitments_df, economic_df, end_date_str, seed, n_workers=1):
     """
     Simulates cash flows and NAV history for each commitment over its life.
 
+    All commitments are laid on a shared quarter-end grid and stepped together,
+    one quarter at a time, in blocks of LIFECYCLE_BLOCK_SIZE commitments. Each
+    block draws from its own stream spawned from `seed`, so the output is
+    identical for any number of workers. The number of NAV rows per commitment
+    is known up front, so blocks write into preallocated arrays that are
+    already in commitment and quarter order.
+
     Args:
         commitments_df (pd.DataFrame): DataFrame of investment commitments.
         economic_df (pd.DataFrame): DataFrame of quarterly economic conditions.
         end_date_str (str): The simulation end date ('YYYY-MM-DD').
         seed (int): The random seed for reproducibility.
+        n_workers (int): The number of worker processes.
 
     Returns:
         tuple: A tuple containing two DataFrames:
                - cash_flows_df (pd.DataFrame): All capital calls and distributions.
                - nav_history_df (pd.DataFrame): Quarterly NAV for each investment.
     """
-    np.random.seed(seed)
-    cash_flows = []
-    nav_history = []
-    end_date = pd.to_datetime(end_date_str)
+    if commitments_df.empty:
+        # There is no first commitment to start the quarter grid from
+        ids = {
+            'investor_id': commitments_df['investor_id'].to_numpy(),
+            'fund_id': commitments_df['fund_id'].to_numpy(),
+            'date': np.array([], dtype='datetime64[ns]'),
+        }
+        cash_flows_df = pd.DataFrame({
+            **ids,
+            'type': pd.Categorical([], categories=['Capital Call', 'Distribution']),
+            'amount_m': np.array([], dtype=float)
+        })
+        nav_history_df = pd.DataFrame({**ids, 'nav_m': np.array([], dtype=float)})
+        return cash_flows_df, nav_history_df
 
-    for _, commitment in commitments_df.iterrows():
-        total_commitment = commitment['commitment_amount_m']
-        commitment_date = commitment['commitment_date']
-        
-        capital_called = 0
-        current_nav = 0
-        
-        # Fund life is typically 10-12 years
-        fund_end_date = min(end_date, commitment_date + pd.DateOffset(years=12))
-        
-        simulation_quarters = pd.date_range(start=commitment_date, end=fund_end_date, freq='Q')
-
-        for quarter_end_date in simulation_quarters:
-            years_since_commit = (quarter_end_date - commitment_date).days / 365.25
-            eco_info = economic_df.asof(quarter_end_date)
-            eco_index = eco_info['economic_index']
-            is_stress = eco_info['is_stress_period']
-            
-            # 1. Capital Calls (Investment Period: Years 0-5)
-            if years_since_commit <= 5 and capital_called < total_commitment:
-                # Higher call probability in early years
-                if np.random.rand() < (0.8 / (1 + years_since_commit)):
-                    remaining_commitment = total_commitment - capital_called
-                    call_pct = np.random.uniform(0.05, 0.20)
-                    call_amount = min(remaining_commitment, call_pct * total_commitment)
-                    
-                    if call_amount > 0.01:
-                        capital_called += call_amount
-                        current_nav += call_amount
-                        cash_flows.append({
-                            'investor_id': commitment['investor_id'],
-                            'fund_id': commitment['fund_id'],
-                            'date': quarter_end_date,
-                            'type': 'Capital Call',
-                            'amount_m': -call_amount
-                        })
-
-            # 2. NAV Growth
-            if current_nav > 0:
-                base_growth = np.random.normal(0.03, 0.015) # Quarterly growth
-                eco_multiplier = (eco_index / 100.0)
-                if is_stress:
-                    eco_multiplier *= 0.5 # Amplify negative effect in stress
-                
-                growth_rate = base_growth * eco_multiplier
-                current_nav *= (1 + growth_rate)
-
-            # 3. Distributions (Harvesting Period: Years 4-12)
-            if years_since_commit > 4 and current_nav > 0:
-                # Higher distribution probability in later years
-                if np.random.rand() < (0.6 * ((years_since_commit - 4) / 8)):
-                    dist_pct = np.random.uniform(0.02, 0.10)
-                    
-                    # Reduce distributions in stress periods
-                    eco_multiplier = (eco_index / 100.0) if not is_stress else (eco_index / 100.0) * 0.25
-                    
-                    dist_amount = current_nav * dist_pct * eco_multiplier
-                    
-                    if dist_amount > 0.01:
-                        current_nav -= dist_amount
-                        cash_flows.append({
-                            'investor_id': commitment['investor_id'],
-                            'fund_id': commitment['fund_id'],
-                            'date': quarter_end_date,
-                            'type': 'Distribution',
-                            'amount_m': dist_amount
-                        })
-            
-            # Record NAV at end of quarter
-            nav_history.append({
-                'investor_id': commitment['investor_id'],
-                'fund_id': commitment['fund_id'],
-                'date': quarter_end_date,
-                'nav_m': max(0, current_nav) # NAV cannot be negative
-            })
-
-    cash_flows_df = pd.DataFrame(cash_flows)
-    nav_history_df = pd.DataFrame(nav_history)
+    end_date = pd.to_datetime(end_date_str)
+    commitment_dates = pd.DatetimeIndex(commitments_df['commitment_date'])
+    # Fund life is typically 10-12 years
+    fund_end_dates = (commitment_dates + pd.DateOffset(years=12)).where(
+        commitment_dates + pd.DateOffset(years=12) < end_date, end_date
+    )
+    grid, eco_index, is_stress = _quarter_grid(commitment_dates, economic_df, end_date)
+    commitment_dates = commitment_dates.to_numpy()
+    first_quarter = np.searchsorted(grid, commitment_dates, side='left').astype(np.int32)
+    last_quarter = (np.searchsorted(grid, fund_end_dates.to_numpy(), side='right') - 1).astype(np.int32)
+
+    # Rows are laid out by commitment, then quarter
+    rows_per_commitment = np.maximum(last_quarter - first_quarter + 1, 0)
+    row_end = np.cumsum(rows_per_commitment, dtype=np.int64)
+    n_rows = int(row_end[-1]) if len(row_end) else 0
+    row_dtype = np.int32 if n_rows < np.iinfo(np.int32).max else np.int64
+    nav, calls, distributions = np.empty(n_rows), np.empty(n_rows), np.empty(n_rows)
+
+    amounts = commitments_df['commitment_amount_m'].to_numpy(dtype=float)
+    blocks = [slice(start, start + LIFECYCLE_BLOCK_SIZE) for start in range(0, len(commitments_df), LIFECYCLE_BLOCK_SIZE)]
+    block_rows = [slice(row_end[block.start] - rows_per_commitment[block.start], row_end[min(block.stop, len(row_end)) - 1])
+                  for block in blocks]
+    generators = spawn_generators(seed, len(blocks))
+    tasks = [
+        (amounts[block], commitment_dates[block], first_quarter[block], last_quarter[block], grid, eco_index, is_stress, rng)
+        for block, rng in zip(blocks, generators)
+    ]
+    if n_workers > 1:
+        with ProcessPoolExecutor(n_workers) as executor:
+            for rows, result in zip(block_rows, executor.map(_simulate_lifecycle_block, *zip(*tasks))):
+                nav[rows], calls[rows], distributions[rows] = result
+    else:
+        for rows, task in zip(block_rows, tasks):
+            _simulate_lifecycle_block(*task, nav=nav[rows], calls=calls[rows], distributions=distributions[rows])
+
+    row_commitment = np.repeat(np.arange(len(commitments_df), dtype=row_dtype), rows_per_commitment)
+    row_quarter = np.arange(n_rows, dtype=row_dtype) - np.repeat((row_end - rows_per_commitment - first_quarter).astype(row_dtype), rows_per_commitment)
+    investor_ids = commitments_df['investor_id'].to_numpy()
+    fund_ids = commitments_df['fund_id'].to_numpy()
+
+    # Each row holds at most a capital call and then a distribution
+    has_call = ~np.isnan(calls)
+    has_distribution = ~np.isnan(distributions)
+    flows_per_row = has_call.astype(np.int8) + has_distribution
+    flow_start = np.cumsum(flows_per_row, dtype=row_dtype) - flows_per_row
+    flow_row = np.repeat(np.arange(n_rows, dtype=row_dtype), flows_per_row)
+    flow_amount = np.empty(len(flow_row))
+    flow_type = np.zeros(len(flow_row), dtype=np.int8)
+    flow_amount[flow_start[has_call]] = -calls[has_call]
+    distribution_flows = flow_start[has_distribution] + has_call[has_distribution]
+    flow_amount[distribution_flows] = distributions[has_distribution]
+    flow_type[distribution_flows] = 1
+    del calls, distributions, has_call, has_distribution, flows_per_row, flow_start, distribution_flows
+
+    cash_flows_df = pd.DataFrame({
+        'investor_id': investor_ids[row_commitment[flow_row]],
+        'fund_id': fund_ids[row_commitment[flow_row]],
+        'date': grid[row_quarter[flow_row]],
+        'type': pd.Categorical.from_codes(flow_type, ['Capital Call', 'Distribution']),
+        'amount_m': flow_amount
+    }, copy=False)
+    del flow_row, flow_amount, flow_type
+
+    nav_history_df = pd.DataFrame({
+        'investor_id': investor_ids[row_commitment],
+        'fund_id': fund_ids[row_commitment],
+        'date': grid[row_quarter],
+        'nav_m': nav
+    }, copy=False)
     
     return cash_flows_df, nav_history_df
 
-
 if __name__ == '__main__':
     # --- Configuration ---
     DATA_DIR = '/work_dir/data'
@@ -294,7 +487,7 @@ if __name__ == '__main__':
     print("Generated " + str(len(funds)) + " fund profiles.")
 
     # 3. Simulate Economic Conditions
-    economic_conditions = simulate_economic_conditions(START_DATE, END_DATE, STRESS_PERIODS)
+    economic_conditions = simulate_economic_conditions(START_DATE, END_DATE, STRESS_PERIODS, seed=RANDOM_SEED + 4)
     economic_path = os.path.join(DATA_DIR, 'economic_conditions.csv')
     economic_conditions.to_csv(economic_path)
     print("Simulated quarterly economic conditions from " + START_DATE + " to " + END_DATE + ".")
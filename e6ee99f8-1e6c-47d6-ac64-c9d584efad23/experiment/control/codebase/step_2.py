@@ -1,6 +1,5 @@
 import pandas as pd
-import networkx as nx
-from itertools import combinations
+import numpy as np
 
 DATA_DIR = '/work_dir/data/'
 
@@ -33,7 +32,220 @@ def load_data(data_dir):
 
     return investors_df, funds_df, commitments_df, cash_flows_df
 
-def build_co_investment_network(commitments_df, investors_df, shock_date):
+def _node_index(investor_ids, nodes=None):
+    """Returns `nodes` followed by any other investors in `investor_ids`."""
+    commitment_investors = pd.Index(pd.unique(np.asarray(investor_ids)))
+    if nodes is None:
+        return commitment_investors
+    node_index = pd.Index(nodes)
+    unseen = commitment_investors.difference(node_index, sort=False)
+    # Appending an empty index is deprecated in pandas and would also disturb the dtype of `nodes`
+    return node_index.append(unseen) if len(unseen) else node_index
+
+class CoInvestmentNetwork:
+    """Weighted co-investment network held as a CSR adjacency matrix.
+
+    Nodes are investors. The weight of edge (i, j) is the number of funds both
+    investors committed to, i.e. the off-diagonal of B·Bᵀ for the investor×fund
+    incidence matrix B. An investor committing to the same fund twice gets no
+    self-loop. Degree and neighbour queries read the CSR arrays directly;
+    `to_networkx` is only needed for graph algorithms.
+
+    Attributes:
+        investor_ids (pd.Index): Investor ID of each node, in row order.
+        adjacency (scipy.sparse.csr_matrix): Symmetric weighted adjacency.
+    """
+
+    def __init__(self, investor_ids, adjacency):
+        self.investor_ids = pd.Index(investor_ids)
+        self.adjacency = adjacency
+
+    @classmethod
+    def from_commitments(cls, investor_ids, fund_ids, nodes=None):
+        """Builds the network from paired investor and fund IDs.
+
+        Args:
+            investor_ids (array-like): Investor ID of each commitment.
+            fund_ids (array-like): Fund ID of each commitment.
+            nodes (array-like, optional): Investors to include even if they
+                have no commitments. Investors with commitments are always
+                included, after these.
+
+        Returns:
+            CoInvestmentNetwork: The co-investment network.
+        """
+        from scipy import sparse
+
+        investor_ids = np.asarray(investor_ids)
+        node_index = _node_index(investor_ids, nodes)
+
+        rows = node_index.get_indexer(investor_ids)
+        fund_codes, fund_uniques = pd.factorize(np.asarray(fund_ids))
+        incidence = sparse.csr_matrix(
+            (np.ones(len(rows)), (rows, fund_codes)),
+            shape=(len(node_index), len(fund_uniques))
+        )
+        incidence.data[:] = 1  # repeat commitments to one fund count once
+
+        adjacency = (incidence @ incidence.T).tocsr()
+        adjacency = (adjacency - sparse.diags(adjacency.diagonal())).tocsr()
+        adjacency.eliminate_zeros()
+        adjacency.sort_indices()
+        return cls(node_index, adjacency)
+
+    def __contains__(self, investor_id):
+        return investor_id in self.investor_ids
+
+    def __len__(self):
+        return len(self.investor_ids)
+
+    def number_of_edges(self):
+        """Returns the number of undirected edges."""
+        return self.adjacency.nnz // 2
+
+    def degree(self):
+        """Returns the number of co-investors of every investor.
+
+        Returns:
+            pd.Series: Degree indexed by investor ID.
+        """
+        return pd.Series(np.diff(self.adjacency.indptr).astype(np.int64), index=self.investor_ids)
+
+    def neighbors(self, investor_id):
+        """Returns the co-investors of one investor.
+
+        Args:
+            investor_id: The investor ID.
+
+        Returns:
+            np.ndarray: Investor IDs of the neighbours, in node order.
+        """
+        row = self.investor_ids.get_loc(investor_id)
+        start, stop = self.adjacency.indptr[row], self.adjacency.indptr[row + 1]
+        return self.investor_ids.to_numpy()[self.adjacency.indices[start:stop]]
+
+    def to_networkx(self):
+        """Converts the network to a networkx graph with 'weight' edge attributes.
+
+        Returns:
+            nx.Graph: The co-investment network.
+        """
+        import networkx as nx
+
+        upper = self.adjacency.tocoo()
+        upper_mask = upper.row < upper.col
+        ids = self.investor_ids.to_numpy()
+
+        G = nx.Graph()
+        G.add_nodes_from(ids)
+        G.add_weighted_edges_from(zip(
+            ids[upper.row[upper_mask]].tolist(),
+            ids[upper.col[upper_mask]].tolist(),
+            upper.data[upper_mask].tolist()
+        ))
+        return G
+
+class TemporalCoInvestmentNetwork:
+    """Co-investment networks over a sliding window of commitment dates.
+
+    Commitments are sorted by date once. The network for the window
+    [end_date - lookback, end_date) is kept as the incidence matrix B of the
+    commitments inside the window and the off-diagonal of A = B·Bᵀ. Moving the
+    window applies only the commitments that enter or leave it:
+
+        A' = (B + ΔB)(B + ΔB)ᵀ = A + ΔB·Bᵀ + B·ΔBᵀ + ΔB·ΔBᵀ
+
+    so a series of nearby snapshots, such as a monthly roll, costs a fraction
+    of rebuilding each window from scratch.
+    """
+
+    def __init__(self, investor_ids, fund_ids, commitment_dates, nodes=None, lookback=pd.DateOffset(years=5)):
+        """Indexes the commitments by date.
+
+        Args:
+            investor_ids (array-like): Investor ID of each commitment.
+            fund_ids (array-like): Fund ID of each commitment.
+            commitment_dates (array-like): Date of each commitment.
+            nodes (array-like, optional): Investors to include even if they
+                have no commitments in a window.
+            lookback (pd.DateOffset): The length of the window.
+        """
+        from scipy import sparse
+
+        investor_ids = np.asarray(investor_ids)
+        commitment_dates = pd.to_datetime(np.asarray(commitment_dates)).to_numpy()
+        order = np.argsort(commitment_dates, kind='stable')
+
+        self.investor_ids = _node_index(investor_ids, nodes)
+        self.lookback = lookback
+        fund_codes, fund_uniques = pd.factorize(np.asarray(fund_ids))
+        self._dates = commitment_dates[order]
+        self._rows = self.investor_ids.get_indexer(investor_ids)[order]
+        self._funds = fund_codes[order]
+
+        shape = (len(self.investor_ids), len(fund_uniques))
+        self._counts = sparse.csr_matrix(shape)
+        self._incidence = sparse.csr_matrix(shape)
+        self._adjacency = sparse.csr_matrix((shape[0], shape[0]))
+        self._window = (0, 0)
+
+    def _window_bounds(self, end_date):
+        """Returns the sorted-event positions [lo, hi) inside the window ending at `end_date`."""
+        end_date = pd.Timestamp(end_date)
+        start_date = end_date - self.lookback
+        lo = np.searchsorted(self._dates, start_date.to_datetime64(), side='left')
+        hi = np.searchsorted(self._dates, end_date.to_datetime64(), side='left')
+        return lo, max(lo, hi)
+
+    def _move_window(self, lo, hi):
+        """Applies the commitments entering and leaving the window."""
+        from scipy import sparse
+
+        old_lo, old_hi = self._window
+        entering = np.r_[lo:min(hi, old_lo), max(lo, old_hi):hi]
+        leaving = np.r_[old_lo:min(old_hi, lo), max(old_lo, hi):old_hi]
+        self._window = (lo, hi)
+        if len(entering) == 0 and len(leaving) == 0:
+            return
+
+        events = np.concatenate([entering, leaving])
+        signs = np.concatenate([np.ones(len(entering)), -np.ones(len(leaving))])
+        # Sparse addition drops entries that cancel to zero, so no cleanup pass is needed
+        counts = self._counts + sparse.csr_matrix(
+            (signs, (self._rows[events], self._funds[events])), shape=self._counts.shape
+        )
+        incidence = counts.sign()  # repeat commitments to one fund count once
+        delta = incidence - self._incidence
+
+        # Only rows touched by the moved commitments change; the diagonal is dropped
+        cross = delta @ self._incidence.T
+        change = (cross + cross.T + delta @ delta.T).tocsr()
+        change = (change - sparse.diags(change.diagonal())).tocsr()
+        change.sort_indices()  # keeps the sum below canonical, with neighbours in node order
+        self._counts, self._incidence, self._adjacency = counts, incidence, self._adjacency + change
+
+    def snapshot(self, end_date):
+        """Returns the network of commitments in [end_date - lookback, end_date).
+
+        Args:
+            end_date (pd.Timestamp): The end of the window (exclusive).
+
+        Returns:
+            CoInvestmentNetwork: The co-investment network for the window.
+        """
+        self._move_window(*self._window_bounds(end_date))
+        return CoInvestmentNetwork(self.investor_ids, self._adjacency)
+
+    def rolling_snapshots(self, end_dates):
+        """Yields (end_date, network) for each window end, in the order given.
+
+        Args:
+            end_dates (iterable): Window ends, e.g. a monthly `pd.date_range`.
+        """
+        for end_date in end_dates:
+            yield end_date, self.snapshot(end_date)
+
+def build_co_investment_network(commitments_df, investors_df, shock_date, as_networkx=False):
     """Constructs a co-investment network for a given shock event.
 
     An edge exists between two investors if they invested in the same fund
@@ -43,9 +255,10 @@ def build_co_investment_network(commitments_df, investors_df, shock_date):
         commitments_df (pd.DataFrame): DataFrame of commitment data.
         investors_df (pd.DataFrame): DataFrame of investor data.
         shock_date (pd.Timestamp): The date of the economic shock.
+        as_networkx (bool): Whether to return a networkx graph instead.
 
     Returns:
-        nx.Graph: A networkx graph representing the co-investment network.
+        CoInvestmentNetwork or nx.Graph: The co-investment network.
     """
     lookback_start_date = shock_date - pd.DateOffset(years=5)
     
@@ -54,21 +267,82 @@ def build_co_investment_network(commitments_df, investors_df, shock_date):
         (commitments_df['Commitment_Date'] < shock_date)
     ]
 
-    fund_investors = relevant_commitments.groupby('Fund_ID')['Investor_ID'].apply(list)
+    network = CoInvestmentNetwork.from_commitments(
+        relevant_commitments['Investor_ID'],
+        relevant_commitments['Fund_ID'],
+        nodes=investors_df['Investor_ID']
+    )
+    return network.to_networkx() if as_networkx else network
 
-    G = nx.Graph()
-    G.add_nodes_from(investors_df['Investor_ID'])
+class FirstMoverIndex:
+    """Date-sorted transaction index for "first transaction after t" queries.
 
-    for investor_list in fund_investors:
-        if len(investor_list) > 1:
-            for investor1, investor2 in combinations(investor_list, 2):
-                G.add_edge(investor1, investor2)
-    
-    return G
+    One view is kept per transaction type, plus an 'Any' view. Each view sorts
+    its transactions by date and then by the tie-break keys used to pick the
+    first mover: the investor's total commitment, then the transaction
+    amount, both descending. The first transaction strictly after t is
+    therefore the first mover, found with a single `searchsorted`.
+    """
+
+    def __init__(self, transactions_df, investors_df):
+        """Builds the sorted views.
+
+        Args:
+            transactions_df (pd.DataFrame): Merged DataFrame of cash flows and commitments.
+            investors_df (pd.DataFrame): DataFrame of investor data for tie-breaking.
+        """
+        total_committed = transactions_df['Investor_ID'].map(
+            investors_df.set_index('Investor_ID')['total_committed']
+        ).to_numpy(dtype=float)
+        self._views = {}
+        self._add_view('Any', transactions_df, total_committed)
+        for behavior in pd.unique(transactions_df['Transaction_Type']):
+            mask = (transactions_df['Transaction_Type'] == behavior).to_numpy()
+            self._add_view(behavior, transactions_df[mask], total_committed[mask])
+
+    def _add_view(self, behavior, transactions_df, total_committed):
+        """Sorts one view by date, then by descending tie-break keys (missing last)."""
+        dates = transactions_df['Transaction_Date'].to_numpy()
+        amounts = transactions_df['Transaction_Amount'].to_numpy(dtype=float)
+        order = np.lexsort((-amounts, -total_committed, dates))
+        self._views[behavior] = (dates[order], transactions_df['Investor_ID'].to_numpy()[order])
+
+    def first_movers(self, shock_dates, behavior):
+        """Identifies the first mover after each of many shock dates in one query.
+
+        Args:
+            shock_dates (array-like): The dates of the economic shocks.
+            behavior (str): The transaction behavior to analyze ('Capital Call',
+                            'Distribution', or 'Any').
+
+        Returns:
+            list: The Investor_ID of the first mover for each shock date, or
+                  None where no transactions occurred after it.
+        """
+        dates, investor_ids = self._views.get(behavior, (np.array([], dtype='datetime64[ns]'), np.array([])))
+        shock_dates = pd.to_datetime(np.atleast_1d(shock_dates)).to_numpy()
+        positions = np.searchsorted(dates, shock_dates, side='right')
+        return [investor_ids[position] if position < len(dates) else None for position in positions]
+
+    def first_mover(self, shock_date, behavior):
+        """Identifies the first mover for a given shock and transaction behavior.
+
+        Args:
+            shock_date (pd.Timestamp): The date of the economic shock.
+            behavior (str): The transaction behavior to analyze.
+
+        Returns:
+            str: The Investor_ID of the identified first mover, or None if no
+                 transactions occurred after the shock.
+        """
+        return self.first_movers([shock_date], behavior)[0]
 
 def find_first_mover(transactions_df, investors_df, shock_date, behavior):
     """Identifies the first mover for a given shock and transaction behavior.
 
+    Builds a FirstMoverIndex for a single query; build the index once instead
+    when querying many shocks.
+
     Args:
         transactions_df (pd.DataFrame): Merged DataFrame of cash flows and commitments.
         investors_df (pd.DataFrame): DataFrame of investor data for tie-breaking.
@@ -80,32 +354,7 @@ def find_first_mover(transactions_df, investors_df, shock_date, behavior):
         str: The Investor_ID of the identified first mover, or None if no
              transactions occurred after the shock.
     """
-    post_shock_tx = transactions_df[transactions_df['Transaction_Date'] > shock_date].copy()
-
-    if behavior != 'Any':
-        post_shock_tx = post_shock_tx[post_shock_tx['Transaction_Type'] == behavior]
-
-    if post_shock_tx.empty:
-        return None
-
-    first_action_date = post_shock_tx['Transaction_Date'].min()
-    
-    tied_movers = post_shock_tx[post_shock_tx['Transaction_Date'] == first_action_date]
-
-    tied_movers_details = pd.merge(
-        tied_movers, 
-        investors_df[['Investor_ID', 'total_committed']], 
-        on='Investor_ID'
-    )
-
-    sorted_movers = tied_movers_details.sort_values(
-        by=['total_committed', 'Transaction_Amount'], 
-        ascending=[False, False]
-    )
-
-    first_mover_id = sorted_movers.iloc[0]['Investor_ID']
-    
-    return first_mover_id
+    return FirstMoverIndex(transactions_df, investors_df).first_mover(shock_date, behavior)
 
 def main():
     """Main function to execute the first-mover analysis.
@@ -123,25 +372,27 @@ def main():
 
     results = []
     networks = {}
+    temporal_network = TemporalCoInvestmentNetwork(
+        commitments_df['Investor_ID'],
+        commitments_df['Fund_ID'],
+        commitments_df['Commitment_Date'],
+        nodes=investors_df['Investor_ID']
+    )
 
-    for shock_name, shock_date_str in SHOCKS.items():
-        shock_date = pd.to_datetime(shock_date_str)
-        
-        networks['G_' + shock_name] = build_co_investment_network(
-            commitments_df, investors_df, shock_date
-        )
+    first_mover_index = FirstMoverIndex(transactions_df, investors_df)
+    shock_dates = pd.to_datetime(list(SHOCKS.values()))
+    first_movers = {
+        behavior: first_mover_index.first_movers(shock_dates, behavior) for behavior in BEHAVIORS
+    }
+
+    for shock_number, (shock_name, shock_date) in enumerate(zip(SHOCKS, shock_dates)):
+        networks['G_' + shock_name] = temporal_network.snapshot(shock_date)
 
         for behavior in BEHAVIORS:
-            first_mover_id = find_first_mover(
-                transactions_df, 
-                investors_df, 
-                shock_date, 
-                behavior
-            )
             results.append({
                 'Shock': shock_name,
                 'Behavior': behavior,
-                'FirstMover_ID': first_mover_id
+                'FirstMover_ID': first_movers[behavior][shock_number]
             })
 
     results_df = pd.DataFrame(results)
@@ -2,10 +2,6 @@ import os
 import datetime
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
-from sklearn.cluster import KMeans
-from sklearn.preprocessing import StandardScaler
-from sklearn.decomposition import PCA
 
 BASE_DIR = '/work_dir'
 DATA_DIR = os.path.join(BASE_DIR, 'data')
@@ -84,6 +80,8 @@ def scale_features(features_df):
     Returns:
         np.ndarray: A NumPy array of the scaled features.
     """
+    from sklearn.preprocessing import StandardScaler
+
     scaler = StandardScaler()
     scaled_data = scaler.fit_transform(features_df)
     return scaled_data
@@ -99,6 +97,9 @@ def plot_elbow_method(scaled_data, max_k, file_path):
         max_k (int): The maximum number of clusters to test.
         file_path (str): The path to save the output plot.
     """
+    import matplotlib.pyplot as plt
+    from sklearn.cluster import KMeans
+
     inertia = []
     k_range = range(1, max_k + 1)
     for k in k_range:
@@ -129,6 +130,8 @@ def perform_clustering(scaled_data, n_clusters):
     Returns:
         np.ndarray: An array of cluster labels for each data point.
     """
+    from sklearn.cluster import KMeans
+
     kmeans = KMeans(n_clusters=n_clusters, random_state=42, n_init=10)
     labels = kmeans.fit_predict(scaled_data)
     return labels
@@ -143,6 +146,8 @@ def reduce_dimensions_with_pca(scaled_data):
     Returns:
         pd.DataFrame: A DataFrame with the first two principal components.
     """
+    from sklearn.decomposition import PCA
+
     pca = PCA(n_components=2)
     principal_components = pca.fit_transform(scaled_data)
     pca_df = pd.DataFrame(data=principal_components, columns=['PC1', 'PC2'])
@@ -160,6 +165,8 @@ def plot_clusters(pca_df, labels, file_path):
         labels (np.ndarray): Array of cluster labels.
         file_path (str): The path to save the output plot.
     """
+    import matplotlib.pyplot as plt
+
     plt.figure(figsize=(12, 8))
     unique_labels = np.unique(labels)
     scatter = plt.scatter(pca_df['PC1'], pca_df['PC2'], c=labels, cmap='viridis', alpha=0.7)
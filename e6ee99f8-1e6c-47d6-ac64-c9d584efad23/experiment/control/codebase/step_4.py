@@ -1,10 +1,10 @@
 import pandas as pd
 import numpy as np
-import networkx as nx
-from lifelines import CoxPHFitter
 from datetime import timedelta
 import os
 
+from step_2 import CoInvestmentNetwork
+
 
 DATA_DIR = "/work_dir/data"
 RESULTS_DIR = DATA_DIR
@@ -43,19 +43,10 @@ def build_investor_network(commitments_df):
         commitments_df (pd.DataFrame): DataFrame with commitment data.
 
     Returns:
-        nx.Graph: A NetworkX graph where nodes are investors and edges represent
-                  co-investment in the same fund.
+        CoInvestmentNetwork: A sparse network where nodes are investors and edges
+                             represent co-investment in the same fund.
     """
-    G = nx.Graph()
-    all_investors = pd.unique(commitments_df['InvestorID'])
-    G.add_nodes_from(all_investors)
-
-    grouped_by_fund = commitments_df.groupby('FundID')['InvestorID'].apply(list)
-    for investors_in_fund in grouped_by_fund:
-        for i in range(len(investors_in_fund)):
-            for j in range(i + 1, len(investors_in_fund)):
-                G.add_edge(investors_in_fund[i], investors_in_fund[j])
-    return G
+    return CoInvestmentNetwork.from_commitments(commitments_df['InvestorID'], commitments_df['FundID'])
 
 def run_cox_model_for_scenario(scenario, cash_flows_df, investors_df, G, shock_periods):
     """
@@ -65,7 +56,7 @@ def run_cox_model_for_scenario(scenario, cash_flows_df, investors_df, G, shock_p
         scenario (pd.Series): A row from the first_movers_df.
         cash_flows_df (pd.DataFrame): DataFrame with all cash flow transactions.
         investors_df (pd.DataFrame): DataFrame with investor attributes.
-        G (nx.Graph): The investor network graph.
+        G (CoInvestmentNetwork): The investor network.
         shock_periods (dict): A dictionary of shock period dates.
     """
     shock = scenario['Shock']
@@ -146,7 +137,7 @@ def run_cox_model_for_scenario(scenario, cash_flows_df, investors_df, G, shock_p
 
     survival_df = pd.DataFrame(survival_data)
 
-    degrees = pd.DataFrame(G.degree(), columns=['InvestorID', 'Network_Degree'])
+    degrees = G.degree().rename_axis('InvestorID').reset_index(name='Network_Degree')
     analysis_df = pd.merge(survival_df, investors_df, on='InvestorID', how='left')
     analysis_df = pd.merge(analysis_df, degrees, on='InvestorID', how='left')
     
@@ -167,6 +158,8 @@ def run_cox_model_for_scenario(scenario, cash_flows_df, investors_df, G, shock_p
         print("Not enough data or no events observed to fit the model. Found " + str(analysis_df.shape[0]) + " data points and " + str(analysis_df['Event'].sum()) + " events.")
         return
 
+    from lifelines import CoxPHFitter
+
     cph = CoxPHFitter()
     try:
         cph.fit(analysis_df[final_model_columns], duration_col='Time', event_col='Event', step_size=0.1)
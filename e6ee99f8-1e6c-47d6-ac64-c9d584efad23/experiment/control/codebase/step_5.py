@@ -1,11 +1,8 @@
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
-import seaborn as sns
 import glob
 import os
 from datetime import datetime
-from lifelines import KaplanMeierFitter
 
 DATA_DIR = '/work_dir/data'
 PLOT_DIR = '/work_dir/plots'
@@ -17,6 +14,9 @@ def create_correlation_heatmap():
     This function visualizes the relationships among demographic attributes,
     investment choices, and transaction behaviors.
     """
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+
     print("Step 5: Creating correlation matrix heatmap...")
     try:
         investors_df = pd.read_csv(os.path.join(DATA_DIR, 'investors.csv'))
@@ -101,6 +101,8 @@ def consolidate_cph_outputs():
 
 def create_forest_plot():
     """Generates a forest plot of hazard ratios from the consolidated CPH results."""
+    import matplotlib.pyplot as plt
+
     print("\nStep 5: Generating forest plot...")
     try:
         consolidated_path = os.path.join(DATA_DIR, 'consolidated_cph_results.csv')
@@ -143,6 +145,9 @@ def plot_survival_curves():
     This function stratifies the population by a key variable ('Network_Degree')
     and plots Kaplan-Meier survival estimates for each group.
     """
+    import matplotlib.pyplot as plt
+    from lifelines import KaplanMeierFitter
+
     print("\nStep 5: Generating survival curves for Eurozone_Any scenario...")
     scenario = 'Eurozone_Any'
     stratify_by = 'Network_Degree'